@@ -10,19 +10,64 @@ import org.jfree.chart.fx.ChartViewer;
 import org.jfree.chart.plot.PlotOrientation;
 import org.jfree.data.category.DefaultCategoryDataset;
 
+import java.net.URI;
+import java.net.http.HttpClient;
+import java.net.http.HttpRequest;
+import java.net.http.HttpResponse;
+import java.time.Duration;
+import java.util.regex.Matcher;
+import java.util.regex.Pattern;
+
 public class DoomWatchApp extends Application {
     private final DefaultCategoryDataset dataset = new DefaultCategoryDataset();
     private int counter = 0;
 
+    private static final String SERVICE_URL =
+            System.getenv().getOrDefault("DOOM_WATCH_URL", "http://127.0.0.1:8765") + "/score";
+    private final HttpClient http = HttpClient.newBuilder()
+            .connectTimeout(Duration.ofSeconds(2))
+            .build();
+
+    // Matches the "score" field wherever it appears in the JSON object
+    private static final Pattern SCORE_FIELD =
+            Pattern.compile("\"score\"\\s*:\\s*(-?[0-9]+(?:\\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)");
+
+    private static double parseScore(String json) {
+        Matcher m = SCORE_FIELD.matcher(json);
+        if (!m.find()) {
+            throw new IllegalArgumentException("no score field in " + json);
+        }
+        return Double.parseDouble(m.group(1));
+    }
+
+    private Double callService() {
+        try {
+            HttpRequest request = HttpRequest.newBuilder(URI.create(SERVICE_URL))
+                    .timeout(Duration.ofSeconds(30))
+                    .GET()
+                    .build();
+            HttpResponse<String> response = http.send(request, HttpResponse.BodyHandlers.ofString());
+            if (response.statusCode() == 200 && response.body().contains("score")) {
+                return parseScore(response.body());
+            }
+        } catch (Exception e) {
+            // Service not running; fall back to a one-off bridge.py process
+        }
+        return null;
+    }
+
     private double callPython() {
+        Double fromService = callService();
+        if (fromService != null) {
+            return fromService;
+        }
         try {
             Process p = new ProcessBuilder("python", "bridge.py").start();
             java.io.BufferedReader reader = new java.io.BufferedReader(new java.io.InputStreamReader(p.getInputStream()));
             String line = reader.readLine();
             p.waitFor();
             if (line != null && line.contains("score")) {
-                String[] parts = line.replace("{", "").replace("}", "").split(":");
-                return Double.parseDouble(parts[1].split(",")[0]);
+                return parseScore(line);
             }
         } catch (Exception e) {
             e.printStackTrace();
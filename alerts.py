@@ -1,12 +1,182 @@
+"""Telegram alerts delivered from a background queue.
+
+``send_telegram`` only enqueues, so scoring never waits on Telegram. The
+AlertDispatcher worker collects messages for a short window into one batch,
+drops repeats of the same alert key inside a cool-down window and retries
+failed deliveries with jittered backoff.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import atexit
 import logging
-import requests
+import os
+import queue
+import threading
+import time
+
 from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from metrics import observe, set_gauge, timed
+from providers import backoff_delay, get_provider
+
+BATCH_WINDOW = 2.0  # seconds to gather messages into one batch
+MAX_BATCH = 20
+COOLDOWN = 30 * 60  # seconds before the same alert key may go out again
+RETRIES = 3
+FLUSH_TIMEOUT = 10.0
+
 
+def post_telegram(msg: str) -> None:
+    """Send a Telegram message now, raising on failure.
 
-def send_telegram(msg: str) -> None:
-    """Send a Telegram message using configured bot credentials."""
+    Makes a single attempt; AlertDispatcher owns the retries.
+    """
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    try:
-        requests.get(url, params={"text": msg, "chat_id": TELEGRAM_CHAT_ID}, timeout=10)
-    except Exception as exc:
-        logging.warning("telegram send failed: %s", exc)
+    get_provider().get(url, params={"text": msg, "chat_id": TELEGRAM_CHAT_ID}, timeout=10,
+                       retries=0).raise_for_status()
+
+
+class AlertDispatcher:
+    """Queue-backed alert sender with batching, per-key cool-down and retries."""
+
+    def __init__(self, sender: Callable[[str], None] = post_telegram, batch_window: float = BATCH_WINDOW,
+                 max_batch: int = MAX_BATCH, cooldown: float = COOLDOWN, retries: int = RETRIES):
+        self.sender = sender
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.cooldown = cooldown
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._last: Dict[str, float] = {}
+        self._flush = threading.Event()
+        self._stop = threading.Event()
+        self._queue: "queue.Queue[Tuple[str, str, float]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = 0
+        self._atexit = False
+        self._stats = {"submitted": 0, "suppressed": 0, "sent": 0, "batches": 0, "failed": 0}
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._last_error: Optional[str] = None
+
+    def submit(self, msg: str, key: Optional[str] = None) -> bool:
+        """Queue ``msg`` unless ``key`` (default: the text) is cooling down."""
+        key = msg if key is None else key
+        now = time.time()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.cooldown:
+                self._stats["suppressed"] += 1
+                return False
+            self._last[key] = now
+            self._stats["submitted"] += 1
+        self._ensure_worker()
+        self._queue.put((key, msg, time.monotonic()))
+        set_gauge("alert_queue_depth", self._queue.qsize())
+        return True
+
+    def _ensure_worker(self) -> None:
+        # Rebuilt in forked children, where the parent's thread does not exist
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            if not self._atexit:
+                atexit.register(self.flush, FLUSH_TIMEOUT)
+                self._atexit = True
+
+    def _collect(self) -> List[Tuple[str, str, float]]:
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            # When flushing, take what is already queued and stop waiting
+            remaining = 0.0 if self._flush.is_set() else deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.1)) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                if remaining <= 0:
+                    break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                try:
+                    self._deliver(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                    set_gauge("alert_queue_depth", self._queue.qsize())
+
+    def _deliver(self, batch: List[Tuple[str, str, float]]) -> None:
+        text = "\n".join(msg for _, msg, _ in batch)
+        for attempt in range(self.retries + 1):
+            try:
+                with timed("telegram"):
+                    self.sender(text)
+                break
+            except Exception as exc:
+                self._last_error = str(exc)
+                if attempt >= self.retries or self._stop.is_set():
+                    logging.warning("telegram send failed: %s", exc)
+                    with self._lock:
+                        self._stats["failed"] += len(batch)
+                        # Let the next cycle try these alerts again
+                        for key, _, _ in batch:
+                            self._last.pop(key, None)
+                    return
+                time.sleep(backoff_delay(attempt))
+        done = time.monotonic()
+        with self._lock:
+            self._stats["sent"] += len(batch)
+            self._stats["batches"] += 1
+            for _, _, queued in batch:
+                observe("alert_latency_seconds", done - queued)
+                self._latency_sum += done - queued
+                self._latency_max = max(self._latency_max, done - queued)
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> bool:
+        """Send queued alerts without waiting for the batch window; True if drained."""
+        self._flush.set()
+        try:
+            deadline = time.monotonic() + timeout
+            while self._queue.unfinished_tasks:
+                if time.monotonic() > deadline or self._thread is None or not self._thread.is_alive():
+                    return False
+                time.sleep(0.02)
+            return True
+        finally:
+            self._flush.clear()
+
+    def stop(self, timeout: float = FLUSH_TIMEOUT) -> None:
+        self.flush(timeout)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return counters, queue depth and enqueue-to-delivery latency in seconds."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["queue_depth"] = self._queue.qsize()
+            stats["latency_avg"] = self._latency_sum / self._stats["sent"] if self._stats["sent"] else 0.0
+            stats["latency_max"] = self._latency_max
+            stats["last_error"] = self._last_error
+        return stats
+
+
+DISPATCHER = AlertDispatcher()
+
+
+def send_telegram(msg: str, key: Optional[str] = None) -> bool:
+    """Queue a Telegram message; returns False if ``key`` is in its cool-down."""
+    return DISPATCHER.submit(msg, key=key)
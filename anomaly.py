@@ -1,29 +1,245 @@
-"""Anomaly detection utilities using Prophet."""
+"""Anomaly detection utilities.
 
-from typing import Dict, List
+The default path is an online Holt forecaster with EWMA residual bands that
+updates in O(1) per observation. Prophet is kept as an optional slow path for
+periodic recalibration and comparison; it is imported only when used.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import logging
+import math
+import warnings
 import numpy as np
-import pandas as pd
-from prophet import Prophet
 
+from tsstore import TimeSeriesStore, get_store, indicator_columns
+
+
+class OnlineAnomalyDetector:
+    """Streaming detector for upward deviations from a Holt linear forecast.
+
+    ``alpha`` and ``beta`` smooth level and trend, ``gamma`` smooths the
+    residual variance, and a value is flagged when it exceeds the one-step
+    forecast by more than ``sensitivity`` residual standard deviations.
+    """
+
+    def __init__(self, sensitivity: float = 3.0, alpha: float = 0.3, beta: float = 0.1,
+                 gamma: float = 0.1, warmup: int = 3, min_std: float = 1e-6):
+        self.sensitivity = sensitivity
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.warmup = warmup
+        self.min_std = min_std
+        self.reset()
+
+    def reset(self) -> None:
+        self.n = 0
+        self.level = 0.0
+        self.trend = 0.0
+        self.resid_var = 0.0
+
+    def forecast(self) -> Tuple[float, float]:
+        """Return the one-step forecast and its upper band."""
+        yhat = self.level + self.trend
+        return yhat, yhat + self.sensitivity * max(math.sqrt(self.resid_var), self.min_std)
+
+    def update(self, y: float) -> bool:
+        """Add an observation and return True if it is an upward anomaly."""
+        y = float(y)
+        if math.isnan(y):
+            return False
+        if self.n == 0:
+            self.level, self.n = y, 1
+            return False
+        yhat, upper = self.forecast()
+        flagged = self.n >= self.warmup and y > upper
+        # Flagged points enter the state clipped to the band, so one spike
+        # neither drags the level nor widens the band for the next one
+        resid = (upper if flagged else y) - yhat
+        level = yhat + self.alpha * resid
+        self.trend = self.beta * (level - self.level) + (1 - self.beta) * self.trend
+        self.level = level
+        self.resid_var = (1 - self.gamma) * self.resid_var + self.gamma * resid * resid
+        self.n += 1
+        return flagged
+
+    def fit(self, values: Sequence[float]) -> List[bool]:
+        """Reset, replay ``values`` and return the flag for each one."""
+        self.reset()
+        return [self.update(v) for v in values]
+
+    def recalibrate(self, values: Sequence[float]) -> None:
+        """Re-seed level, trend and residual scale from a Prophet fit.
+
+        This is the slow path, meant to run occasionally over a long window.
+        Falls back to replaying the values when Prophet is unavailable.
+        """
+        values = [float(v) for v in values if not math.isnan(float(v))]
+        if len(values) < 3:
+            self.fit(values)
+            return
+        try:
+            yhat = _prophet_fit(values)
+        except Exception as exc:
+            logging.warning("prophet recalibration failed, replaying history: %s", exc)
+            self.fit(values)
+            return
+        self.level = float(yhat[-1])
+        self.trend = float(yhat[-1] - yhat[-2])
+        self.resid_var = float(np.mean((np.asarray(values) - yhat[: len(values)]) ** 2))
+        self.n = len(values)
+
+
+def _prophet_fit(values: Sequence[float], periods: int = 0):
+    """Fit Prophet on a daily series and return in-sample (+future) forecasts."""
+    import pandas as pd
+    from prophet import Prophet
+
+    df = pd.DataFrame({"y": values, "ds": pd.date_range(end=pd.Timestamp.today(), periods=len(values))})
+    model = Prophet()
+    model.fit(df)
+    forecast = model.predict(model.make_future_dataframe(periods=periods))
+    if periods:
+        return forecast
+    return forecast["yhat"].to_numpy()
+
+
+def _aggregate(data_window: List[Dict[str, float]]) -> np.ndarray:
+    """Average each snapshot's values into a single series, ignoring NaNs."""
+    keys = sorted(set().union(*data_window))
+    matrix = np.array([[row.get(k, np.nan) for k in keys] for row in data_window], dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows
+        return np.nanmean(matrix, axis=1)
+
+
+def _prophet_anomaly(series: np.ndarray) -> bool:
+    forecast = _prophet_fit(series[:-1], periods=1)
+    return bool(series[-1] > forecast["yhat_upper"].iloc[-1])
 
-def detect_anomaly(data_window: List[Dict[str, float]]) -> bool:
-    """Return True if the latest aggregated value deviates above forecast."""
+
+def detect_anomaly(data_window: List[Dict[str, float]], method: str = "online",
+                   sensitivity: float = 3.0) -> bool:
+    """Return True if the latest aggregated value deviates above forecast.
+
+    ``method="online"`` replays the window through an OnlineAnomalyDetector;
+    ``method="prophet"`` fits Prophet on all but the last value.
+    """
     if len(data_window) < 3:
         return False
 
-    # Average values into a single series
-    df = pd.DataFrame(data_window)
-    df["y"] = df.mean(axis=1)
-    df["ds"] = pd.date_range(end=pd.Timestamp.today(), periods=len(df))
-
-    try:
-        model = Prophet()
-        model.fit(df[["ds", "y"]])
-        future = model.make_future_dataframe(periods=1)
-        forecast = model.predict(future)
-        return forecast["yhat"].iloc[-1] > forecast["yhat_upper"].iloc[-1]
-    except Exception as exc:
-        logging.warning("prophet anomaly detection failed: %s", exc)
-        return False
+    series = _aggregate(data_window)
+    if method == "prophet":
+        try:
+            return _prophet_anomaly(series)
+        except Exception as exc:
+            logging.warning("prophet anomaly detection failed: %s", exc)
+            return False
+    detector = OnlineAnomalyDetector(sensitivity=sensitivity)
+    detector.fit(series[:-1])
+    return detector.update(series[-1])
+
+
+def _chi2_quantile(dof: int, z: float) -> float:
+    """Wilson-Hilferty approximation of the chi-square quantile at normal score ``z``."""
+    c = 2.0 / (9.0 * dof)
+    return dof * (1 - c + z * math.sqrt(c)) ** 3
+
+
+def _sorted_quantile(ordered: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolated quantile along the last axis of a sorted array."""
+    pos = q * (ordered.shape[-1] - 1)
+    lo = int(math.floor(pos))
+    hi = min(lo + 1, ordered.shape[-1] - 1)
+    return ordered[..., lo] + (pos - lo) * (ordered[..., hi] - ordered[..., lo])
+
+
+def robust_anomaly_scores(X: np.ndarray, window: int = 30, z_threshold: float = 3.5,
+                          iqr_factor: float = 1.5, joint_z: float = 3.09,
+                          min_scale: float = 1e-6) -> Dict[str, np.ndarray]:
+    """Score every row of an ``(n, k)`` indicator matrix against its trailing window.
+
+    Row ``t`` is compared with rows ``t - window .. t - 1``; the first
+    ``window`` rows have no reference and get NaN scores and False flags.
+    Returns per-indicator robust z-scores (median/MAD), IQR flags from rolling
+    quartiles, a joint Mahalanobis distance per row and boolean flags. The
+    joint threshold is the chi-square quantile for ``k`` degrees of freedom at
+    normal score ``joint_z`` (3.09 is roughly the 99.9th percentile). An
+    indicator whose window contains NaN gets a NaN z-score and no flags, and
+    a row whose values or window contain any NaN gets a NaN distance.
+    MAD and IQR are floored at ``min_scale * max(|median|, 1)`` so that a
+    change after a flat window is flagged by both checks.
+    """
+    X = np.asarray(X, dtype=float)
+    n, k = X.shape
+    robust_z = np.full((n, k), np.nan)
+    iqr_flags = np.zeros((n, k), dtype=bool)
+    distance = np.full(n, np.nan)
+    if n > window >= 2 and k:
+        win = np.lib.stride_tricks.sliding_window_view(X[:-1], window, axis=0)  # (m, k, window)
+        cur = X[window:]
+        # np.sort puts NaN last, which would leave the median finite; mask instead
+        win_nan = np.isnan(win).any(axis=-1)  # (m, k)
+        row_nan = win_nan.any(axis=1) | np.isnan(cur).any(axis=1)
+        if row_nan.any():
+            # Zero the gaps so the batched solve stays finite; masked below
+            win = np.nan_to_num(win, nan=0.0)
+            cur = np.nan_to_num(cur, nan=0.0)
+        # One sort serves the median and both quartiles
+        ordered = np.sort(win, axis=-1)
+        med = _sorted_quantile(ordered, 0.5)
+        mad = _sorted_quantile(np.sort(np.abs(win - med[..., None]), axis=-1), 0.5)
+        floor = min_scale * np.maximum(np.abs(med), 1.0)
+        robust_z[window:] = 0.6745 * (cur - med) / np.maximum(mad, floor)
+        q1, q3 = _sorted_quantile(ordered, 0.25), _sorted_quantile(ordered, 0.75)
+        # IQR is about twice the MAD for normal data, so floor it to match
+        spread = iqr_factor * np.maximum(q3 - q1, 2.0 * floor)
+        iqr_flags[window:] = (cur < q1 - spread) | (cur > q3 + spread)
+        if row_nan.any():
+            cur_nan = np.isnan(X[window:])
+            robust_z[window:][win_nan | cur_nan] = np.nan
+            iqr_flags[window:][win_nan | cur_nan] = False
+
+        mean = win.mean(axis=-1)
+        centered = win - mean[..., None]
+        cov = np.matmul(centered, centered.transpose(0, 2, 1)) / (window - 1)
+        # A small ridge keeps constant indicators from making cov singular
+        cov += np.eye(k) * (1e-9 + 1e-9 * np.trace(cov, axis1=1, axis2=2)[:, None, None])
+        diff = cur - mean
+        solved = np.linalg.solve(cov, diff[..., None])[..., 0]
+        distance[window:] = np.sqrt(np.maximum(np.einsum("mk,mk->m", diff, solved), 0.0))
+        distance[window:][row_nan] = np.nan
+
+    with np.errstate(invalid="ignore"):
+        flags = np.abs(robust_z) > z_threshold
+        joint_flags = distance ** 2 > (_chi2_quantile(k, joint_z) if k else np.inf)
+    return {
+        "robust_z": robust_z,
+        "flags": flags,
+        "iqr_flags": iqr_flags,
+        "mahalanobis": distance,
+        "joint_flags": joint_flags,
+    }
+
+
+def backfill_anomalies(store: Optional[TimeSeriesStore] = None, window: int = 30,
+                       start: Optional[float] = None, end: Optional[float] = None, **kwargs) -> Dict[str, np.ndarray]:
+    """Run robust_anomaly_scores over stored snapshots in one call.
+
+    The result also carries ``ts`` and the indicator ``columns`` used.
+    """
+    store = get_store() if store is None else store
+    columns = indicator_columns(store)
+    ts, cols = store.read(start, end, columns)
+    X = np.column_stack([cols[c] for c in columns]) if columns else np.empty((len(ts), 0))
+    result = robust_anomaly_scores(X, window=window, **kwargs)
+    result["ts"] = np.asarray(ts)
+    result["columns"] = np.array(columns)
+    return result
+
+
+def detect_stored_anomaly(window: int = 30, store: Optional[TimeSeriesStore] = None) -> bool:
+    """Run detect_anomaly on the last ``window`` stored indicator snapshots."""
+    store = get_store() if store is None else store
+    return detect_anomaly(store.records(window, indicator_columns(store)))
@@ -0,0 +1,216 @@
+"""Backtesting harness that replays stored indicators through the scoring pipeline.
+
+A DataProvider stands in for the network sources of ``get_live_data``; each
+row goes through normalisation, scoring, scenarios, the online anomaly
+detector and the momentum engine exactly as a live refresh would. Independent
+date ranges run in parallel on a process pool.
+
+    python backtest.py history.csv --workers 4
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+import argparse
+import logging
+import os
+import random
+import time
+
+import numpy as np
+
+from config import HISTORY_WINDOW
+
+TRENDS_COLUMN = "google_trends_spike"
+
+
+class DataProvider:
+    """Indicator values per timestamp, served as ``get_live_data`` sources.
+
+    Holds plain arrays so it can be sliced and sent to worker processes.
+    Missing values (NaN) behave like a failed fetch and use the live fallbacks.
+    """
+
+    def __init__(self, ts: Sequence[float], values: Mapping[str, Sequence[float]]):
+        self.ts = np.asarray(ts, dtype=float)
+        order = np.argsort(self.ts, kind="stable")
+        self.ts = self.ts[order]
+        self.values = {k: np.asarray(v, dtype=float)[order] for k, v in values.items()}
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_frame(cls, df) -> "DataProvider":
+        """Build from a DataFrame with a datetime index or a ``ts`` column."""
+        import pandas as pd
+
+        if "ts" in df.columns:
+            ts = df["ts"].to_numpy(dtype=float)
+            df = df.drop(columns="ts")
+        else:
+            ts = pd.DatetimeIndex(df.index).asi8 / 1e9
+        return cls(ts, {c: df[c].to_numpy(dtype=float) for c in df.columns})
+
+    @classmethod
+    def from_csv(cls, path: str) -> "DataProvider":
+        import pandas as pd
+
+        df = pd.read_csv(path)
+        if "ts" not in df.columns:
+            df = df.set_index(pd.to_datetime(df.iloc[:, 0])).drop(columns=df.columns[0])
+        return cls.from_frame(df)
+
+    @classmethod
+    def from_store(cls, store=None, start: Optional[float] = None, end: Optional[float] = None) -> "DataProvider":
+        """Build from the snapshot store (indicator columns only)."""
+        from tsstore import get_store, indicator_columns
+
+        store = get_store() if store is None else store
+        ts, cols = store.read(start, end, indicator_columns(store))
+        return cls(np.array(ts), {c: np.array(v) for c, v in cols.items()})
+
+    def slice(self, lo: int, hi: int) -> "DataProvider":
+        return DataProvider(self.ts[lo:hi], {k: v[lo:hi] for k, v in self.values.items()})
+
+    def sources_at(self, i: int) -> Dict[str, Callable[[], float]]:
+        """Return zero-argument fetchers for row ``i``, like doom_watch.SOURCES."""
+        sources = {}
+        for key, column in self.values.items():
+            if key == TRENDS_COLUMN:
+                continue
+            sources[key] = _Fetch(float(column[i]))
+        return sources
+
+    def trends_spike_at(self, i: int) -> bool:
+        column = self.values.get(TRENDS_COLUMN)
+        return bool(column is not None and column[i] > 0)
+
+
+class _Fetch:
+    def __init__(self, value: float):
+        self.value = value
+
+    def __call__(self) -> float:
+        if np.isnan(self.value):
+            raise ValueError("no historical value")
+        return self.value
+
+
+def _replay(job: Tuple[DataProvider, int, int]) -> Dict[str, np.ndarray]:
+    """Replay one range; the first ``warmup`` rows only prime the state."""
+    provider, warmup, seed = job
+    import doom_watch as dw
+    from anomaly import OnlineAnomalyDetector
+    from momentum import MomentumEngine
+
+    random.seed(seed)
+    dw.reset_history()
+    detector = OnlineAnomalyDetector()
+    engine = MomentumEngine(dw.INDICATORS)
+    n = len(provider) - warmup
+    scores = np.zeros(n)
+    triggered = np.zeros((n, len(dw.SCENARIO_ENGINE.names)), dtype=bool)
+    anomalies = np.zeros(n, dtype=bool)
+    momentum = np.zeros((n,) + engine.aggregate.shape)
+
+    start = time.perf_counter()
+    for i in range(len(provider)):
+        data = dw.get_live_data(sources=provider.sources_at(i))
+        score, names = dw.calculate_risk_score(data, trends_spike=provider.trends_spike_at(i))
+        flagged = detector.update(np.mean([data[k] for k in dw.INDICATORS]))
+        engine.update(data)
+        j = i - warmup
+        if j >= 0:
+            scores[j] = score
+            triggered[j] = [name in names for name in dw.SCENARIO_ENGINE.names]
+            anomalies[j] = flagged
+            momentum[j] = engine.aggregate
+    return {
+        "ts": provider.ts[warmup:],
+        "score": scores,
+        "triggered": triggered,
+        "anomaly": anomalies,
+        "momentum": momentum,
+        "seconds": np.array(time.perf_counter() - start),
+    }
+
+
+def _quiet_worker() -> None:
+    # Per-row fallback warnings would flood the parent's stderr
+    logging.getLogger().setLevel(logging.ERROR)
+
+
+def split_ranges(ts: np.ndarray, parts: int) -> List[Tuple[float, float]]:
+    """Split timestamps into ``parts`` contiguous ranges of similar size."""
+    if not len(ts):
+        return []
+    bounds = np.array_split(np.arange(len(ts)), max(1, min(parts, len(ts))))
+    return [(float(ts[b[0]]), float(ts[b[-1]])) for b in bounds if len(b)]
+
+
+def run_backtest(provider: DataProvider, ranges: Optional[Sequence[Tuple[float, float]]] = None,
+                 workers: Optional[int] = None, warmup: int = HISTORY_WINDOW, seed: int = 0) -> Dict:
+    """Replay ``provider`` and return score series plus throughput statistics.
+
+    ``ranges`` are inclusive ``(start, end)`` timestamp pairs (default: one
+    range per worker). Each range is replayed independently with ``warmup``
+    preceding rows to prime the normalisation history.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = list(ranges) if ranges is not None else split_ranges(provider.ts, workers)
+    jobs = []
+    for k, (lo_ts, hi_ts) in enumerate(ranges):
+        lo = int(np.searchsorted(provider.ts, lo_ts, side="left"))
+        hi = int(np.searchsorted(provider.ts, hi_ts, side="right"))
+        pre = min(warmup, lo)
+        jobs.append((provider.slice(lo - pre, hi), pre, seed + k))
+
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        parts = [_replay(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_quiet_worker) as pool:
+            parts = list(pool.map(_replay, jobs))
+    elapsed = time.perf_counter() - start
+
+    import doom_watch as dw
+    from momentum import FEATURES, MOMENTUM_WINDOWS
+
+    rows = sum(len(p["score"]) for p in parts)
+    cat = (lambda key: np.concatenate([p[key] for p in parts])) if parts else (lambda key: np.empty(0))
+    return {
+        "ts": cat("ts"),
+        "score": cat("score"),
+        "triggered": cat("triggered"),
+        "scenario_names": list(dw.SCENARIO_ENGINE.names),
+        "anomaly": cat("anomaly"),
+        "momentum": cat("momentum"),
+        "momentum_labels": (FEATURES, MOMENTUM_WINDOWS),
+        "stats": {
+            "rows": rows,
+            "ranges": len(jobs),
+            "workers": min(workers, max(len(jobs), 1)),
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed else 0.0,
+            "worker_seconds": [float(p["seconds"]) for p in parts],
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay historical indicators through the scoring pipeline")
+    parser.add_argument("path", help="CSV with a ts column or a date first column, plus indicator columns")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", help="write ts,score,anomaly CSV here")
+    args = parser.parse_args()
+
+    result = run_backtest(DataProvider.from_csv(args.path), workers=args.workers)
+    stats = result["stats"]
+    print(f"{stats['rows']} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:.0f} rows/s, {stats['ranges']} ranges on {stats['workers']} workers)")
+    if len(result["score"]):
+        print(f"score mean {result['score'].mean():.3f}  max {result['score'].max():.3f}  "
+              f"anomalies {int(result['anomaly'].sum())}")
+    if args.out:
+        np.savetxt(args.out, np.column_stack([result["ts"], result["score"], result["anomaly"]]),
+                   delimiter=",", header="ts,score,anomaly", comments="", fmt=["%.0f", "%.6f", "%d"])
@@ -0,0 +1,81 @@
+"""Latency and agreement of the online anomaly detector versus Prophet.
+
+Generates a noisy trending series with injected upward spikes, then for each
+check window compares ``detect_anomaly(method="online")`` with the Prophet
+slow path: mean latency per check, hit rate on injected spikes and how often
+the two methods agree. Prophet is skipped when it is not installed.
+
+    python benchmarks/bench_anomaly.py [--length 200] [--window 60] [--checks 40]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from anomaly import OnlineAnomalyDetector, detect_anomaly  # noqa: E402
+
+
+def make_series(length: int, spikes: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    series = 0.5 + 0.001 * np.arange(length) + rng.normal(0, 0.02, length)
+    spike_at = rng.choice(np.arange(length // 4, length), size=spikes, replace=False)
+    series[spike_at] += 0.2
+    return series, set(spike_at.tolist())
+
+
+def run(method: str, series: np.ndarray, window: int, ends) -> tuple:
+    flags, times = [], []
+    for end in ends:
+        rows = [{"x": v} for v in series[end - window:end]]
+        start = time.perf_counter()
+        flags.append(detect_anomaly(rows, method=method))
+        times.append(time.perf_counter() - start)
+    return flags, times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=200)
+    parser.add_argument("--window", type=int, default=60)
+    parser.add_argument("--checks", type=int, default=40)
+    parser.add_argument("--spikes", type=int, default=8)
+    args = parser.parse_args()
+
+    series, spikes = make_series(args.length, args.spikes)
+    ends = np.linspace(args.window, args.length, args.checks, dtype=int)
+    ends = sorted(set(ends.tolist()) | {s + 1 for s in spikes if s + 1 >= args.window})
+
+    # Pure streaming cost: one update per observation
+    detector = OnlineAnomalyDetector()
+    start = time.perf_counter()
+    stream_flags = detector.fit(series)
+    per_update = (time.perf_counter() - start) / len(series)
+    caught = sum(stream_flags[i] for i in spikes)
+    print(f"online stream   {per_update * 1e6:9.2f} us/update  spikes caught {caught}/{len(spikes)}")
+
+    results = {}
+    methods = ["online"]
+    try:
+        import prophet  # noqa: F401
+        methods.append("prophet")
+    except ImportError:
+        print("prophet not installed; skipping slow path")
+    for method in methods:
+        flags, times = run(method, series, args.window, ends)
+        results[method] = flags
+        hits = sum(f for f, e in zip(flags, ends) if e - 1 in spikes)
+        print(f"{method:8s} window {statistics.mean(times) * 1000:9.3f} ms/check  "
+              f"spike hits {hits}/{sum(e - 1 in spikes for e in ends)}  flags {sum(flags)}/{len(flags)}")
+    if len(results) == 2:
+        agree = np.mean(np.array(results["online"]) == np.array(results["prophet"]))
+        print(f"agreement       {agree:.1%}")
+
+
+if __name__ == "__main__":
+    main()
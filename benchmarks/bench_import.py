@@ -0,0 +1,69 @@
+"""Import-time guard for the score-only entry points.
+
+Runs each target in a fresh interpreter, reports the best wall time over a few
+runs and fails (exit code 1) if a target is over budget or pulls in one of the
+heavy optional dependencies at import time.
+
+    python benchmarks/bench_import.py [--runs 5] [--budget 0.4]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ["pandas", "plotly", "requests", "yfinance", "pytrends", "transformers", "torch", "prophet", "feedparser"]
+
+# name -> statement executed in a fresh interpreter
+TARGETS = {
+    "doom_watch": "import doom_watch",
+    "bridge-client": "import bridge",
+    # bridge with no service listening (port 9 refuses): the modules its fallback imports
+    "bridge-fallback": "import os; os.environ['DOOM_WATCH_PORT'] = '9'; import bridge; "
+                       "assert bridge._from_service() is None; import doom_watch, sentiment_model",
+    "scoring": "import doom_watch as dw; dw.calculate_risk_scores([[0.5] * len(dw.INDICATORS)], trends_spike=False)",
+}
+
+_PROBE = "import sys, json, time; t = time.perf_counter(); {stmt}; " \
+         "print(json.dumps({{'seconds': time.perf_counter() - t, 'modules': sorted(sys.modules)}}))"
+
+
+def measure(stmt: str, runs: int) -> dict:
+    """Return the best import time and the heavy modules loaded by ``stmt``."""
+    best = best_wall = float("inf")
+    loaded = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(stmt=stmt)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        best_wall = min(best_wall, time.perf_counter() - start)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        best = min(best, result["seconds"])
+        loaded = [m for m in HEAVY if m in result["modules"]]
+    return {"import_seconds": best, "process_seconds": best_wall, "heavy_modules": loaded}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=0.4, help="max import seconds per target")
+    args = parser.parse_args()
+
+    failed = False
+    for name, stmt in TARGETS.items():
+        res = measure(stmt, args.runs)
+        ok = res["import_seconds"] <= args.budget and not res["heavy_modules"]
+        failed |= not ok
+        print(f"{name:15s} {res['import_seconds'] * 1000:8.1f} ms  "
+              f"heavy={','.join(res['heavy_modules']) or '-'}  {'ok' if ok else 'FAIL'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
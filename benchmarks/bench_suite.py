@@ -0,0 +1,222 @@
+"""Offline benchmark suite for the scoring hot paths.
+
+Every case runs against the fixtures in ``benchmarks/fixtures`` (see
+``offline.py``), so no network access or real model is needed. Each case is
+swept over a data-size parameter and timed with an adaptive loop count; the
+median time per call is reported.
+
+    python benchmarks/bench_suite.py                       # run everything
+    python benchmarks/bench_suite.py --quick --only rss    # small sweep, one case
+    python benchmarks/bench_suite.py --save baseline.json  # store a baseline
+    python benchmarks/bench_suite.py --compare baseline.json --tolerance 1.3
+
+``--compare`` exits with code 1 if any measurement is slower than the
+baseline by more than ``tolerance`` times.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import offline  # noqa: F401  (sets DOOM_WATCH_DATA_DIR and sys.path first)
+
+import numpy as np  # noqa: E402
+
+# name -> (sweep parameter, full sweep, quick sweep)
+SWEEPS: Dict[str, Tuple[str, List[int], List[int]]] = {
+    "normalize_value": ("calls", [1, 100, 1000], [1, 100]),
+    "calculate_risk_score": ("rows", [1, 100, 1000, 10000], [1, 100]),
+    "scenario_adjustment": ("rows", [1, 100, 1000, 10000], [1, 100]),
+    "fetch_rss_texts": ("items_per_feed", [10, 100, 500], [10, 50]),
+    "get_sentiment_score": ("texts", [10, 100, 1000], [10, 100]),
+    "calc_momentum_features": ("window", [10, 100, 1000], [10, 100]),
+    "momentum_engine": ("snapshots", [100, 1000], [100]),
+    "detect_anomalies": ("indicators", [9, 90, 900], [9, 90]),
+    "detect_anomaly": ("window", [30, 100, 300], [30, 100]),
+    "robust_anomaly_scores": ("rows", [1000, 10000], [1000]),
+    "get_live_data": ("items_per_feed", [10, 100], [10]),
+}
+
+
+def measure(fn: Callable[[], object], setup: Optional[Callable[[], None]] = None,
+            repeat: int = 5, min_time: float = 0.05) -> Dict[str, float]:
+    """Return median/min seconds per call over ``repeat`` timed batches.
+
+    The loop count grows until one batch takes at least ``min_time``.
+    ``setup`` runs before every call (e.g. to empty a cache) and is not timed.
+    """
+    def batch(loops: int) -> float:
+        total = 0.0
+        for _ in range(loops):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            fn()
+            total += time.perf_counter() - start
+        return total
+
+    loops = 1
+    while True:
+        elapsed = batch(loops)
+        if elapsed >= min_time or loops >= 1 << 16:
+            break
+        loops *= 2 if elapsed * 4 > min_time else 8
+    times = [elapsed / loops] + [batch(loops) / loops for _ in range(repeat - 1)]
+    return {"median": statistics.median(times), "min": min(times), "loops": loops}
+
+
+def _snapshots(rng: np.random.Generator, n: int) -> List[Dict[str, float]]:
+    import doom_watch as dw
+
+    X = rng.uniform(0.0, 1.0, (n, len(dw.INDICATORS)))
+    return [dict(zip(dw.INDICATORS, row)) for row in X]
+
+
+def _case(name: str, n: int, rng: np.random.Generator) -> Tuple[Callable[[], object], Optional[Callable[[], None]]]:
+    """Return ``(fn, setup)`` timing ``name`` at sweep size ``n``."""
+    import doom_watch as dw
+
+    spike = offline.trends_spike()
+    if name == "normalize_value":
+        values = rng.uniform(0, 1, n)
+        return (lambda: [dw.normalize_value("faiz_orani", v) for v in values]), None
+    if name == "calculate_risk_score":
+        if n == 1:
+            row = _snapshots(rng, 1)[0]
+            return (lambda: dw.calculate_risk_score(row, trends_spike=spike)), None
+        X = rng.uniform(0, 1, (n, len(dw.INDICATORS)))
+        return (lambda: dw.calculate_risk_scores(X, trends_spike=spike)), None
+    if name == "scenario_adjustment":
+        from politika_scenarios import ENGINE, scenario_adjustment
+
+        if n == 1:
+            row = _snapshots(rng, 1)[0]
+            return (lambda: scenario_adjustment(row)), None
+        X = rng.uniform(0, 1, (n, len(dw.INDICATORS)))
+        return (lambda: ENGINE.evaluate(X, dw.INDICATORS)), None
+    if name == "fetch_rss_texts":
+        from feeds import FEED_CACHE
+        from providers import FakeProvider, set_provider
+        from sentiment import fetch_rss_texts
+
+        set_provider(FakeProvider(offline.routes(n)))
+        return (lambda: fetch_rss_texts(limit=0)), FEED_CACHE.clear
+    if name == "get_sentiment_score":
+        from sentiment import get_sentiment_score
+        from sentiment_cache import get_cache
+
+        texts = [f"Piyasalarda {i}. gün: enflasyon beklentilerin üzerinde, borsa yükseldi" for i in range(n)]
+        cache = get_cache()
+        # Cold cache: every call runs inference on all texts
+        return (lambda: get_sentiment_score(texts)), (cache.clear if cache else None)
+    if name == "calc_momentum_features":
+        from momentum import calc_momentum_features
+
+        window = _snapshots(rng, n)
+        return (lambda: calc_momentum_features(window)), None
+    if name == "momentum_engine":
+        from momentum import MomentumEngine
+
+        window = _snapshots(rng, n)
+
+        def run() -> None:
+            engine = MomentumEngine(dw.INDICATORS)
+            for snap in window:
+                engine.update(snap)
+
+        return run, None
+    if name == "detect_anomalies":
+        from doom_watch_modules import detect_anomalies
+
+        keys = [f"x{i}" for i in range(n)]
+        data = dict(zip(keys, rng.normal(0, 1, n)))
+        params = {k: {"mean": 0.0, "std": 1.0, "q1": -0.67, "q3": 0.67} for k in keys}
+        return (lambda: detect_anomalies(data, params)), None
+    if name == "detect_anomaly":
+        from anomaly import detect_anomaly
+
+        closes = offline.ohlc_frame()["Close"].to_numpy()
+        series = np.resize(closes / closes[0], n)
+        window = [{"XU100": float(v)} for v in series]
+        return (lambda: detect_anomaly(window)), None
+    if name == "robust_anomaly_scores":
+        from anomaly import robust_anomaly_scores
+
+        X = rng.normal(0, 1, (n, len(dw.INDICATORS)))
+        return (lambda: robust_anomaly_scores(X)), None
+    if name == "get_live_data":
+        from feeds import FEED_CACHE
+
+        offline.install(items_per_feed=n)
+
+        def cold() -> None:
+            FEED_CACHE.clear()
+            dw._TE_CACHE.clear()
+
+        return (lambda: dw.get_live_data()), cold
+    raise KeyError(name)
+
+
+def run(names: List[str], quick: bool = False, repeat: int = 5) -> Dict[str, Dict[str, Dict[str, float]]]:
+    offline.install()
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name in names:
+        param, full, small = SWEEPS[name]
+        results[name] = {}
+        for n in (small if quick else full):
+            fn, setup = _case(name, n, np.random.default_rng(0))
+            res = measure(fn, setup=setup, repeat=repeat)
+            results[name][str(n)] = res
+            print(f"{name:24s} {param}={n:<7d} {res['median'] * 1e3:10.3f} ms  "
+                  f"(min {res['min'] * 1e3:.3f}, loops {res['loops']})", flush=True)
+        offline.install()
+    return results
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> bool:
+    """Print ratios against ``baseline``; return True if nothing regressed."""
+    ok = True
+    for name, sweep in results.items():
+        for n, res in sweep.items():
+            base = baseline.get("results", {}).get(name, {}).get(n)
+            if not base:
+                continue
+            ratio = res["median"] / base["median"] if base["median"] else float("inf")
+            slow = ratio > tolerance
+            ok &= not slow
+            print(f"{name:24s} {n:>7s} {ratio:6.2f}x {'REGRESSION' if slow else 'ok'}")
+    return ok
+
+
+def main() -> int:
+    import logging
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="*", help="run cases whose name contains one of these")
+    parser.add_argument("--quick", action="store_true", help="smaller sweeps")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="write results as a baseline JSON")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.3, help="max slowdown ratio vs. baseline")
+    args = parser.parse_args()
+    # Fixtures trigger the same fallback warnings a flaky network would
+    logging.basicConfig(level=logging.ERROR)
+
+    names = [n for n in SWEEPS if not args.only or any(p in n for p in args.only)]
+    results = run(names, quick=args.quick, repeat=args.repeat)
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump({"python": platform.python_version(), "machine": platform.platform(),
+                       "numpy": np.__version__, "results": results}, fh, indent=1)
+    if args.compare:
+        with open(args.compare) as fh:
+            return 0 if compare(results, json.load(fh), args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
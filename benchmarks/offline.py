@@ -0,0 +1,157 @@
+"""Offline stand-ins for every external dependency of the scoring pipeline.
+
+``install()`` points the pipeline at the sample payloads in ``fixtures/``:
+RSS feeds, TradingEconomics JSON and TCMB rates (``today.xml`` and archive
+days derived from it) are served by a ``providers.FakeProvider``, the BERT model is replaced by a small lexicon
+model registered under its own id (``LEXICON_MODEL``) and the data directory
+is always a new temporary one. The yfinance and Google Trends fixtures use the layout of
+``Ticker.history`` and ``interest_over_time`` and are loaded with pandas.
+
+Import this module before any repo module so ``DOOM_WATCH_DATA_DIR`` is set
+before ``config`` reads it.
+"""
+
+from typing import Dict, List, Optional
+import glob
+import os
+import re
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+LEXICON_MODEL = "offline-lexicon"
+
+# Always a fresh directory: benchmarks clear caches and must never touch real data
+if "config" in sys.modules:
+    raise RuntimeError("import benchmarks/offline.py before any repo module")
+os.environ["DOOM_WATCH_DATA_DIR"] = tempfile.mkdtemp(prefix="doom-watch-bench-")
+sys.path.insert(0, ROOT)
+
+_POSITIVE = ("yüksel", "art", "olumlu", "toparlan", "güven", "düşük", "geriledi", "pozitif", "kazandı")
+_NEGATIVE = ("rekor", "açık", "zayıf", "yavaş", "sıkılaş", "kriz", "azaldı", "genişledi", "beklentilerin üzerinde")
+
+
+class LexiconModel:
+    """Tiny stand-in for the transformers sentiment pipeline.
+
+    Counts positive and negative Turkish stems and returns results in the
+    pipeline's ``[{"label", "score"}]`` format, so batching, truncation and
+    caching code runs unchanged.
+    """
+
+    def __call__(self, texts, batch_size: int = 1, truncation: bool = True, max_length: int = 128, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        results = []
+        for text in texts:
+            words = text.lower().split()[:max_length]
+            pos = sum(1 for w in words for s in _POSITIVE if s in w)
+            neg = sum(1 for w in words for s in _NEGATIVE if s in w)
+            total = pos + neg
+            score = 0.5 + 0.5 * abs(pos - neg) / total if total else 0.5
+            results.append({"label": "POSITIVE" if pos >= neg else "NEGATIVE", "score": score})
+        return results
+
+
+def read(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as fh:
+        return fh.read()
+
+
+def rss_fixtures() -> List[bytes]:
+    return [read(os.path.basename(p)) for p in sorted(glob.glob(os.path.join(FIXTURES, "rss_*.xml")))]
+
+
+_ITEM = re.compile(rb"<item>.*?</item>", re.S)
+
+
+def scale_feed(body: bytes, items: int, tag: str = "") -> bytes:
+    """Repeat a fixture feed's items until it has ``items`` distinct entries."""
+    found = _ITEM.findall(body)
+    head, tail = body.split(found[0], 1)[0], body.rsplit(found[-1], 1)[1]
+    out = []
+    for i in range(items):
+        item = found[i % len(found)]
+        if i >= len(found) or tag:
+            # Distinct numbers keep replicas from collapsing in the deduper
+            item = item.replace(b"</title>", f" #{tag}{i}</title>".encode(), 1)
+            item = item.replace(b"</description>", f" ({tag}{i * 7919 % 100003})</description>".encode(), 1)
+        out.append(item)
+    return head + b"\n".join(out) + tail
+
+
+def tcmb_archive(url: str, params=None) -> bytes:
+    """Archive file for the date in ``url``, derived from the today.xml fixture.
+
+    Rates follow a deterministic daily random walk so volatility code sees
+    realistic returns; weekends are not requested by the backfill.
+    """
+    import datetime
+    import random as _random
+
+    day = datetime.datetime.strptime(url.rsplit("/", 1)[1][:8], "%d%m%Y").date()
+    rng = _random.Random(day.toordinal())
+    drift = 1 + 0.0004 * (day.toordinal() % 365) + rng.gauss(0, 0.006)
+    body = read("tcmb_today.xml").decode("utf-8")
+    body = re.sub(r'Date="[^"]*"', f'Date="{day:%m/%d/%Y}"', body, count=1)
+    body = re.sub(r"<(Forex\w+|Banknote\w+)>([\d.]+)<",
+                  lambda m: f"<{m.group(1)}>{float(m.group(2)) * drift:.4f}<", body)
+    return body.encode("utf-8")
+
+
+def routes(items_per_feed: Optional[int] = None, tag: str = "") -> Dict[str, object]:
+    """URL -> payload map for FakeProvider covering every live source."""
+    from doom_watch import _te_url
+    from providers import Response
+    from sentiment import RSS_FEEDS
+
+    table: Dict[str, object] = {
+        "https://www.tcmb.gov.tr/kurlar/today.xml": read("tcmb_today.xml"),
+        "www.tcmb.gov.tr": tcmb_archive,
+    }
+    for indicator in ("interest-rate", "inflation-cpi", "unemployment-rate"):
+        table[_te_url(indicator).split("?", 1)[0]] = read(f"te_{indicator}.json")
+    feeds = rss_fixtures()
+    for i, url in enumerate(RSS_FEEDS):
+        body = feeds[i % len(feeds)]
+        if items_per_feed:
+            body = scale_feed(body, items_per_feed, tag=f"{tag}{i}.")
+        table[url] = Response(url, 200, body, {"Content-Type": "application/rss+xml; charset=utf-8"})
+    return table
+
+
+def install(items_per_feed: Optional[int] = None, latency: float = 0.0):
+    """Route all network access to fixtures and swap in the lexicon model.
+
+    Returns the installed FakeProvider so callers can inspect ``calls``.
+    """
+    from providers import FakeProvider, set_provider
+    from sentiment_model import set_pipeline, use_model
+
+    provider = FakeProvider(routes(items_per_feed), latency=latency)
+    set_provider(provider)
+    set_pipeline(LexiconModel(), LEXICON_MODEL)
+    use_model(LEXICON_MODEL)
+    return provider
+
+
+def trends_frame():
+    """Google Trends fixture in ``TrendReq.interest_over_time`` layout."""
+    import pandas as pd
+
+    return pd.read_csv(os.path.join(FIXTURES, "trends.csv"), index_col="date", parse_dates=True)
+
+
+def trends_spike() -> bool:
+    from market_watch import TRENDS_KEYWORDS, _trends_spike
+
+    return _trends_spike(trends_frame(), TRENDS_KEYWORDS)
+
+
+def ohlc_frame(ticker: str = "XU100.IS"):
+    """yfinance fixture in ``Ticker.history`` layout."""
+    import pandas as pd
+
+    return pd.read_csv(os.path.join(FIXTURES, f"yf_{ticker}.csv"), index_col="Date", parse_dates=True)
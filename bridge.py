@@ -1,11 +1,36 @@
 import json
-import doom_watch as dw
+import urllib.request
 
-current_data = dw.get_live_data()
-score, scenarios = dw.calculate_risk_score(current_data)
+from config import SERVICE_HOST, SERVICE_PORT
 
-output = {
-    "score": score,
-    "scenarios": scenarios,
-}
-print(json.dumps(output))
+
+def _from_service():
+    """Return the latest snapshot from a running service, or None."""
+    try:
+        url = f"http://{SERVICE_HOST}:{SERVICE_PORT}/score"
+        with urllib.request.urlopen(url, timeout=2) as resp:
+            return json.load(resp)
+    except Exception:
+        return None
+
+
+def main() -> None:
+    snapshot = _from_service()
+    if snapshot is None:
+        import doom_watch as dw
+        from sentiment_model import warm_up
+
+        warm_up()  # outside the refresh budget
+        current_data = dw.get_live_data()
+        score, scenarios = dw.calculate_risk_score(current_data)
+        snapshot = {"score": score, "scenarios": scenarios}
+
+    output = {
+        "score": snapshot["score"],
+        "scenarios": snapshot["scenarios"],
+    }
+    print(json.dumps(output))
+
+
+if __name__ == "__main__":
+    main()
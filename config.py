@@ -5,3 +5,10 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "YOUR_CHAT_ID")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "YOUR_OPENAI_KEY")
 TRADING_ECON_KEY = os.getenv("TRADING_ECON_KEY", "")
 EVDS_KEY = os.getenv("EVDS_KEY", "")
+DATA_DIR = os.getenv("DOOM_WATCH_DATA_DIR", "data")
+HISTORY_WINDOW = int(os.getenv("DOOM_WATCH_HISTORY_WINDOW", "12"))
+SERVICE_HOST = os.getenv("DOOM_WATCH_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("DOOM_WATCH_PORT", "8765"))
+# Stored doviz_kur_volatilite rows older than this (epoch seconds) hold the
+# USD/EUR cross spread rather than daily basket volatility
+FX_VOL_SINCE = float(os.getenv("DOOM_WATCH_FX_VOL_SINCE", "1792195200"))
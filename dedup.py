@@ -0,0 +1,107 @@
+"""Exact and near-duplicate detection plus keyword matching for news texts."""
+
+from typing import Dict, Iterable, List, Set, Tuple
+import re
+import zlib
+
+import numpy as np
+
+_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r"\w+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall(text.casefold())
+
+
+class MinHasher:
+    """MinHash signatures over word shingles."""
+
+    def __init__(self, num_perm: int = 64, shingle: int = 3, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the ``num_perm`` minimum hashes of the text's shingles."""
+        words = _tokens(text)
+        k = min(self.shingle, len(words)) or 1
+        shingles = {" ".join(words[i:i + k]) for i in range(max(len(words) - k + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # a * x + b fits in uint64 for 31-bit a and 32-bit crc32 x
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+
+class TextDeduper:
+    """Drop exact repeats via a set and near repeats via MinHash LSH buckets."""
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._hasher = MinHasher(num_perm=num_perm)
+        self._exact: Set[str] = set()
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[np.ndarray] = []
+
+    def check(self, text: str) -> str:
+        """Register ``text`` and return ``"new"``, ``"exact"`` or ``"near"``."""
+        key = " ".join(text.casefold().split())
+        if key in self._exact:
+            return "exact"
+        self._exact.add(key)
+        sig = self._hasher.signature(text)
+        bands = [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+        candidates = {j for band, b in zip(self._buckets, bands) for j in band.get(b, ())}
+        for j in candidates:
+            if np.mean(self._signatures[j] == sig) >= self.threshold:
+                return "near"
+        idx = len(self._signatures)
+        self._signatures.append(sig)
+        for band, b in zip(self._buckets, bands):
+            band.setdefault(b, []).append(idx)
+        return "new"
+
+
+class KeywordMatcher:
+    """Case-insensitive substring match against many keywords with one regex."""
+
+    def __init__(self, keywords: Iterable[str]):
+        kws = sorted({kw.lower() for kw in keywords if kw}, key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, kws))) if kws else None
+
+    def __bool__(self) -> bool:
+        return self._pattern is not None
+
+    def matches(self, text: str) -> bool:
+        return self._pattern is None or self._pattern.search(text.lower()) is not None
+
+
+def filter_texts(texts: Iterable[str], keywords: Iterable[str] = (), limit: int = 0,
+                 deduper: TextDeduper = None) -> Tuple[List[str], Dict[str, int]]:
+    """Return unique keyword-matching texts and counts of what was dropped."""
+    deduper = deduper or TextDeduper()
+    matcher = KeywordMatcher(keywords or ())
+    kept: List[str] = []
+    stats = {"seen": 0, "kept": 0, "empty": 0, "exact_duplicate": 0, "near_duplicate": 0, "keyword_miss": 0}
+    for text in texts:
+        stats["seen"] += 1
+        if not text.strip():
+            stats["empty"] += 1
+            continue
+        if not matcher.matches(text):
+            stats["keyword_miss"] += 1
+            continue
+        status = deduper.check(text)
+        if status != "new":
+            stats[f"{status}_duplicate"] += 1
+            continue
+        kept.append(text)
+        if limit and len(kept) >= limit:
+            break
+    stats["kept"] = len(kept)
+    return kept, stats
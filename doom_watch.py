@@ -1,25 +1,34 @@
 # Example risk indicator using real data when available.
 # Not intended for real trading or investment decisions.
+#
+# Heavy dependencies (requests via providers, plotly, pandas/yfinance/pytrends through
+# market_watch, transformers through sentiment) are imported on first use so
+# that score-only callers start quickly; see benchmarks/bench_import.py.
 
 import datetime
+import importlib
 import logging
 import math
+import os
 import random
-import requests
-from typing import Dict, List, Tuple, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Tuple, Optional
 
-import plotly.graph_objects as go
+import numpy as np
 
-from alerts import send_telegram
-from market_watch import check_google_trends, check_bist_crash
-from sentiment import get_public_sentiment
-from politika_scenarios import scenario_adjustment
-from config import TRADING_ECON_KEY, EVDS_KEY
+from politika_scenarios import ENGINE as SCENARIO_ENGINE
+from config import TRADING_ECON_KEY, EVDS_KEY, HISTORY_WINDOW, FX_VOL_SINCE
+from metrics import inc, timed
+from rolling import RollingHistory
+from tsstore import SCENARIO_PREFIX, SCORE_COLUMN, TimeSeriesStore, get_store
 
 # Normalization parameters for economic indicators
 NORMALIZATION = {
     "faiz_orani": {"min": 0.0, "max": 1.0, "mean": 0.5, "std": 0.1},
-    "doviz_kur_volatilite": {"min": 0.0, "max": 0.1, "mean": 0.03, "std": 0.02},
+    # daily EWMA volatility of the TCMB USD/EUR basket (see fx.py)
+    "doviz_kur_volatilite": {"min": 0.0, "max": 0.03, "mean": 0.008, "std": 0.005},
     "enflasyon_farki": {"min": 0.0, "max": 0.3, "mean": 0.1, "std": 0.05},
     "issizlik_orani": {"min": 0.0, "max": 0.2, "mean": 0.1, "std": 0.03},
     "otomotiv_talep_degisimi": {"min": -0.2, "max": 0.1, "mean": -0.05, "std": 0.07},
@@ -31,147 +40,370 @@ NORMALIZATION = {
 
 SCALER = "minmax"  # or 'zscore'
 
+# Per-source request timeout and overall refresh budget (seconds)
+SOURCE_TIMEOUT = 10.0
+REFRESH_BUDGET = 15.0
+TE_TTL = 60.0  # seconds a TradingEconomics response is reused
+
+INDICATORS: List[str] = list(NORMALIZATION)
+
+# Names re-exported from heavier modules, resolved lazily by __getattr__
+_LAZY = {
+    "send_telegram": "alerts",
+    "check_google_trends": "market_watch",
+    "check_bist_crash": "market_watch",
+    "TRENDS": "market_watch",
+    "get_public_sentiment": "sentiment",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Risk weights per indicator and the indicators where a higher value means less risk
+RISK_WEIGHTS: Dict[str, float] = {
+    "faiz_orani": 0.15,
+    "doviz_kur_volatilite": 0.20,
+    "enflasyon_farki": 0.20,
+    "issizlik_orani": 0.10,
+    "otomotiv_talep_degisimi": 0.08,
+    "global_ticaret_gerilimi_index": 0.05,
+    "politik_belirsizlik_skoru": 0.07,
+    "guven_endeksi_degisimi": 0.05,
+    "public_sentiment": 0.10,
+}
+INVERTED = ("otomotiv_talep_degisimi", "guven_endeksi_degisimi")
+
+_WEIGHTS = np.array([RISK_WEIGHTS[k] for k in INDICATORS])
+_INVERTED = np.isin(INDICATORS, INVERTED)
+_SENTIMENT = INDICATORS.index("public_sentiment")
+
+
+def set_risk_weights(weights: Dict[str, float]) -> None:
+    """Replace RISK_WEIGHTS, e.g. with learned importances; missing indicators get 0."""
+    global _WEIGHTS
+    unknown = set(weights) - set(INDICATORS)
+    if unknown:
+        raise ValueError(f"unknown indicators: {sorted(unknown)}")
+    RISK_WEIGHTS.clear()
+    RISK_WEIGHTS.update({k: float(weights.get(k, 0.0)) for k in INDICATORS})
+    _WEIGHTS = np.array([RISK_WEIGHTS[k] for k in INDICATORS])
+
 _CACHED_DATA: Optional[Dict[str, float]] = None
-HISTORY: Dict[str, List[float]] = {k: [] for k in NORMALIZATION}
+_TE_CACHE: Dict[str, Tuple[float, List[Dict[str, float]]]] = {}
+_TE_LOCKS: Dict[str, threading.Lock] = {}
+_TE_LOCK = threading.Lock()
+HISTORY = RollingHistory(INDICATORS, window=HISTORY_WINDOW)
+_HISTORY_WARM = False
 
 
-def normalize_value(name: str, value: float) -> float:
-    """Normalize a value using the configured scaler and rolling history."""
-    params = NORMALIZATION[name]
-    hist = HISTORY.get(name, [])
-    if hist:
-        mean = sum(hist) / len(hist)
-        std = (sum((x - mean) ** 2 for x in hist) / len(hist)) ** 0.5
-        params = {**params, "min": min(hist), "max": max(hist), "mean": mean, "std": std}
+def _scale(value: float, params: Dict[str, float]) -> float:
     if SCALER == "zscore":
         z = (value - params["mean"]) / params["std"] if params["std"] else 0.0
         return 1 / (1 + math.exp(-z))
-    norm = (value - params["min"]) / (params["max"] - params["min"])
+    span = params["max"] - params["min"]
+    if not span:
+        return 0.5
+    norm = (value - params["min"]) / span
     return max(0.0, min(norm, 1.0))
 
 
-def fetch_json(url: str) -> List[Dict[str, float]]:
-    """Helper to load JSON with timeout."""
-    r = requests.get(url, timeout=10)
-    r.raise_for_status()
-    return r.json()
+def normalize_value(name: str, value: float) -> float:
+    """Normalize a value using the configured scaler and rolling history."""
+    win = HISTORY[name]
+    params = win.stats() if len(win) else NORMALIZATION[name]
+    return _scale(value, params)
 
 
-def fetch_xml(url: str) -> Optional[str]:
+def normalize_array(values: np.ndarray) -> np.ndarray:
+    """Normalize an array whose last axis follows INDICATORS in one call."""
+    values = np.asarray(values, dtype=float)
+    lo, hi, mean, std = HISTORY.stats_matrix(NORMALIZATION)
+    if SCALER == "zscore":
+        z = np.divide(values - mean, std, out=np.zeros(values.shape), where=std != 0)
+        return 1 / (1 + np.exp(-z))
+    span = hi - lo
+    norm = np.divide(values - lo, span, out=np.full(values.shape, 0.5), where=span != 0)
+    return np.clip(norm, 0.0, 1.0)
+
+
+def normalize_all(data: Dict[str, float]) -> Dict[str, float]:
+    """Normalize every indicator in ``data`` with one vectorised call."""
+    row = np.array([data.get(k, np.nan) for k in INDICATORS])
+    return {k: float(v) for k, v in zip(INDICATORS, normalize_array(row)) if k in data}
+
+
+def fetch_json(url: str, timeout: float = SOURCE_TIMEOUT) -> List[Dict[str, float]]:
+    """Helper to load JSON with timeout through the shared provider."""
+    from providers import get_provider
+
+    return get_provider().get_json(url, timeout=timeout)
+
+
+def fetch_xml(url: str, timeout: float = SOURCE_TIMEOUT) -> Optional[str]:
     """Fetch XML string from URL."""
     try:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        return r.text
+        from providers import get_provider
+
+        return get_provider().get_text(url, timeout=timeout)
     except Exception as exc:
         logging.warning("xml fetch failed: %s", exc)
         return None
 
 
-def get_live_data() -> Dict[str, float]:
-    """Fetch live economic data with API fallbacks to random."""
-    global _CACHED_DATA
-    data: Dict[str, float] = {}
+def _te_url(indicator: str) -> str:
+    return f"https://api.tradingeconomics.com/country/TUR/indicator/{indicator}?c={TRADING_ECON_KEY}&format=json"
 
-    data["public_sentiment"] = get_public_sentiment()
 
-    # Interest rate
-    try:
-        url = f"https://api.tradingeconomics.com/country/TUR/indicator/interest-rate?c={TRADING_ECON_KEY}&format=json"
-        resp = fetch_json(url)
-        data["faiz_orani"] = float(resp[0]["Value"]) / 100
-    except Exception as exc:
-        logging.warning("interest rate fetch failed: %s", exc)
-        data["faiz_orani"] = random.uniform(0.40, 0.60)
+def _te_json(indicator: str) -> List[Dict[str, float]]:
+    """Fetch a TradingEconomics series, reusing responses for TE_TTL seconds.
 
-    # Inflation and PPI difference
-    try:
-        cpi_url = f"https://api.tradingeconomics.com/country/TUR/indicator/inflation-cpi?c={TRADING_ECON_KEY}&format=json"
-        unemp_url = f"https://api.tradingeconomics.com/country/TUR/indicator/unemployment-rate?c={TRADING_ECON_KEY}&format=json"
-        cpi = fetch_json(cpi_url)[0]["Value"]
-        ppi = fetch_json(unemp_url)[0]["Value"]  # placeholder; not real ppi
-        data["enflasyon_farki"] = abs(float(cpi) - float(ppi)) / 100
-    except Exception as exc:
-        logging.warning("inflation fetch failed: %s", exc)
-        cpi_sim = (_CACHED_DATA or {}).get("cpi", random.uniform(0.40, 0.70) * 100)
-        ppi_sim = cpi_sim * random.uniform(0.8, 1.2)
-        data["enflasyon_farki"] = abs((cpi_sim - ppi_sim) / 100.0)
+    Sources that read the same series in one refresh share a single
+    download; the per-indicator lock makes a concurrent caller wait for it.
+    """
+    with _TE_LOCK:
+        lock = _TE_LOCKS.setdefault(indicator, threading.Lock())
+    with lock:
+        hit = _TE_CACHE.get(indicator)
+        if hit is not None and time.monotonic() - hit[0] < TE_TTL:
+            return hit[1]
+        resp = fetch_json(_te_url(indicator))
+        _TE_CACHE[indicator] = (time.monotonic(), resp)
+        return resp
 
-    # Unemployment
-    try:
-        url = f"https://api.tradingeconomics.com/country/TUR/indicator/unemployment-rate?c={TRADING_ECON_KEY}&format=json"
-        resp = fetch_json(url)
-        data["issizlik_orani"] = float(resp[0]["Value"]) / 100
-    except Exception as exc:
-        logging.warning("unemployment fetch failed: %s", exc)
-        data["issizlik_orani"] = random.uniform(0.08, 0.12)
 
-    # Exchange rate volatility from CBRT XML
-    xml_text = fetch_xml("https://www.tcmb.gov.tr/kurlar/today.xml")
-    try:
-        if xml_text:
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(xml_text)
-            usd = float(root.findtext('.//Currency[@CurrencyCode="USD"]/ForexSelling'))
-            eur = float(root.findtext('.//Currency[@CurrencyCode="EUR"]/ForexSelling'))
-            vol = abs(usd - eur) / ((usd + eur) / 2)
-            data["doviz_kur_volatilite"] = vol
-        else:
-            raise ValueError("no xml")
-    except Exception as exc:
-        logging.warning("exchange rate parse failed: %s", exc)
-        data["doviz_kur_volatilite"] = (_CACHED_DATA or {}).get("doviz_kur_volatilite", random.uniform(0.01, 0.05))
+def _interest_rate() -> float:
+    resp = _te_json("interest-rate")
+    return float(resp[0]["Value"]) / 100
+
+
+def _inflation_gap() -> float:
+    cpi = _te_json("inflation-cpi")[0]["Value"]
+    ppi = _te_json("unemployment-rate")[0]["Value"]  # placeholder; not real ppi
+    return abs(float(cpi) - float(ppi)) / 100
+
+
+def _unemployment() -> float:
+    resp = _te_json("unemployment-rate")
+    return float(resp[0]["Value"]) / 100
+
+
+def _fx_volatility() -> float:
+    """Daily EWMA volatility of the USD/EUR basket from cached TCMB rates."""
+    from fx import basket_volatility
+
+    return basket_volatility()
+
+
+def _public_sentiment() -> float:
+    from sentiment import get_public_sentiment
+
+    return get_public_sentiment()
+
+
+def _inflation_fallback() -> float:
+    cpi_sim = (_CACHED_DATA or {}).get("cpi", random.uniform(0.40, 0.70) * 100)
+    ppi_sim = cpi_sim * random.uniform(0.8, 1.2)
+    return abs((cpi_sim - ppi_sim) / 100.0)
+
+
+# Indicator sources fetched concurrently by get_live_data
+SOURCES: Dict[str, Callable[[], float]] = {
+    "public_sentiment": _public_sentiment,
+    "faiz_orani": _interest_rate,
+    "enflasyon_farki": _inflation_gap,
+    "issizlik_orani": _unemployment,
+    "doviz_kur_volatilite": _fx_volatility,
+}
+
+# Values used when a source fails or misses the refresh budget
+FALLBACKS: Dict[str, Callable[[], float]] = {
+    "public_sentiment": lambda: (_CACHED_DATA or {}).get("public_sentiment", 0.0),
+    "faiz_orani": lambda: random.uniform(0.40, 0.60),
+    "enflasyon_farki": _inflation_fallback,
+    "issizlik_orani": lambda: random.uniform(0.08, 0.12),
+    "doviz_kur_volatilite": lambda: (_CACHED_DATA or {}).get("doviz_kur_volatilite", random.uniform(0.004, 0.012)),
+}
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_PID = 0
+# Fetches that overran a refresh budget, reused by the next refresh
+_PENDING: Dict[str, Tuple[Callable[[], float], Future]] = {}
+
+
+def _executor() -> ThreadPoolExecutor:
+    """Return the fetch pool, rebuilding it in forked child processes.
+
+    Twice the number of sources, so sources still running from an earlier
+    refresh never starve the next one.
+    """
+    global _EXECUTOR, _EXECUTOR_PID
+    if _EXECUTOR is None or _EXECUTOR_PID != os.getpid():
+        _EXECUTOR = ThreadPoolExecutor(max_workers=2 * len(SOURCES), thread_name_prefix="doom-fetch")
+        _EXECUTOR_PID = os.getpid()
+        _PENDING.clear()
+    return _EXECUTOR
+
+
+def _submit(pool: ThreadPoolExecutor, key: str, fetch: Callable[[], float]) -> Future:
+    """Start ``fetch``, or reuse its run left over from an earlier refresh."""
+    pending = _PENDING.get(key)
+    if pending is not None and pending[0] is fetch and not pending[1].done():
+        return pending[1]
+    future = pool.submit(timed(key, metric="source_seconds")(fetch))
+    _PENDING[key] = (fetch, future)
+    return future
+
+
+@timed("get_live_data")
+def get_live_data(budget: float = REFRESH_BUDGET,
+                  sources: Optional[Dict[str, Callable[[], float]]] = None) -> Dict[str, float]:
+    """Fetch live economic data concurrently with API fallbacks to random.
+
+    All sources are started at once; any source that fails or has not
+    finished within ``budget`` seconds falls back to its cached or random value.
+    A source that overran is not started again: the next refresh waits on
+    the same run. ``sources`` replaces SOURCES, e.g. with a historical data
+    provider. Load the sentiment model beforehand (``sentiment_model.warm_up``)
+    so its first load does not count against the budget.
+    """
+    global _CACHED_DATA
+    data: Dict[str, float] = {}
+    if not _HISTORY_WARM:
+        warm_history()
+
+    pool = _executor()
+    futures = {key: _submit(pool, key, fetch) for key, fetch in (SOURCES if sources is None else sources).items()}
+    wait(futures.values(), timeout=budget)
+    for key, future in futures.items():
+        try:
+            if not future.done():
+                raise TimeoutError(f"exceeded refresh budget of {budget:.0f}s")
+            data[key] = float(future.result())
+        except Exception as exc:
+            logging.warning("%s fetch failed: %s", key, exc)
+            inc("fallback_total", source=key)
+            if key in FALLBACKS:
+                data[key] = FALLBACKS[key]()
 
     data.setdefault("otomotiv_talep_degisimi", random.uniform(-0.15, 0.05))
     data.setdefault("global_ticaret_gerilimi_index", random.uniform(0.5, 1.0))
     data.setdefault("politik_belirsizlik_skoru", random.uniform(0.6, 1.0))
     data.setdefault("guven_endeksi_degisimi", random.uniform(-0.03, 0.02))
 
-    for key in HISTORY:
-        if key in data:
-            HISTORY[key].append(data[key])
-        HISTORY[key] = HISTORY[key][-12:]
+    HISTORY.append(data)
 
     _CACHED_DATA = data
     return data
 
 
-def calculate_risk_score(data: Dict[str, float]) -> Tuple[float, List[str]]:
+def warm_history(store: Optional[TimeSeriesStore] = None) -> int:
+    """Refill HISTORY with the most recent stored snapshots; return rows loaded."""
+    global _HISTORY_WARM
+    _HISTORY_WARM = True
+    try:
+        store = get_store() if store is None else store
+        ts, cols = store.tail(HISTORY.window, INDICATORS)
+    except Exception as exc:
+        logging.warning("history warm-up failed: %s", exc)
+        return 0
+    HISTORY.clear()
+    for key, values in cols.items():
+        keep = ~np.isnan(values)
+        if key == "doviz_kur_volatilite":
+            # Rows from before the switch to daily volatility hold the USD/EUR cross spread
+            keep &= ts >= FX_VOL_SINCE
+        HISTORY[key].extend(values[keep])
+    return max((len(v) for v in cols.values()), default=0)
+
+
+def reset_history(load_store: bool = False) -> None:
+    """Empty HISTORY; with ``load_store`` refill it from the snapshot store."""
+    global _HISTORY_WARM
+    HISTORY.clear()
+    if load_store:
+        warm_history()
+    else:
+        _HISTORY_WARM = True
+
+
+def record_snapshot(data: Dict[str, float], score: float, scenarios: List[str],
+                    store: Optional[TimeSeriesStore] = None, ts: Optional[float] = None) -> None:
+    """Append a snapshot with its score and triggered scenarios to the store."""
+    row = {k: data[k] for k in INDICATORS if k in data}
+    row[SCORE_COLUMN] = score
+    for name in SCENARIO_ENGINE.names:
+        row[SCENARIO_PREFIX + name] = float(name in scenarios)
+    try:
+        (get_store() if store is None else store).append(row, ts=ts)
+    except Exception as exc:
+        logging.warning("snapshot store append failed: %s", exc)
+
+
+def _observation_matrix(observations) -> np.ndarray:
+    """Return observations as a float array with columns in INDICATORS order."""
+    if hasattr(observations, "columns"):
+        n = len(observations)
+        cols = []
+        for k in INDICATORS:
+            if k == "public_sentiment" and k not in observations.columns:
+                cols.append(np.zeros(n))
+            else:
+                cols.append(np.asarray(observations[k], dtype=float))
+        return np.column_stack(cols) if n else np.empty((0, len(INDICATORS)))
+    X = np.asarray(observations, dtype=float)
+    if X.ndim != 2 or X.shape[1] != len(INDICATORS):
+        raise ValueError(f"expected an (n, {len(INDICATORS)}) array in INDICATORS order")
+    return X
+
+
+def calculate_risk_scores(observations, trends_spike: Optional[bool] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Score many observations at once.
+
+    ``observations`` is a DataFrame with indicator columns or a 2-D array with
+    columns in INDICATORS order. Unless ``trends_spike`` is given, the cached
+    Google Trends flag is used; scoring itself never waits on the network. Returns ``(scores, triggered)`` where
+    ``triggered`` is a boolean mask with one column per SCENARIO_ENGINE.names.
+    Results match calculate_risk_score row by row.
+    """
+    X = _observation_matrix(observations)
+    contributions = normalize_array(X)
+    contributions[:, _INVERTED] = 1 - contributions[:, _INVERTED]
+    contributions[:, _SENTIMENT] = 1 - ((X[:, _SENTIMENT] + 1) / 2)
+
+    # Column by column so the summation order matches the scalar formula
+    base_score = np.zeros(len(X))
+    for j, weight in enumerate(_WEIGHTS):
+        base_score = base_score + contributions[:, j] * weight
+    if trends_spike is None:
+        from market_watch import TRENDS
+
+        trends_spike = TRENDS.spike()
+    if trends_spike:
+        base_score = base_score + 0.05
+
+    adjustment, triggered = SCENARIO_ENGINE.evaluate(X, INDICATORS)
+    return np.clip(base_score + adjustment, 0.0, 1.0), triggered
+
+
+@timed("calculate_risk_score")
+def calculate_risk_score(data: Dict[str, float], trends_spike: Optional[bool] = None) -> Tuple[float, List[str]]:
     """Calculate a risk score from live data."""
-    weights = {
-        "faiz_orani": 0.15,
-        "doviz_kur_volatilite": 0.20,
-        "enflasyon_farki": 0.20,
-        "issizlik_orani": 0.10,
-        "otomotiv_talep_degisimi": 0.08,
-        "global_ticaret_gerilimi_index": 0.05,
-        "politik_belirsizlik_skoru": 0.07,
-        "guven_endeksi_degisimi": 0.05,
-        "public_sentiment": 0.10,
-    }
-
-    risk_contributions = {
-        "faiz_orani": normalize_value("faiz_orani", data["faiz_orani"]),
-        "doviz_kur_volatilite": normalize_value("doviz_kur_volatilite", data["doviz_kur_volatilite"]),
-        "enflasyon_farki": normalize_value("enflasyon_farki", data["enflasyon_farki"]),
-        "issizlik_orani": normalize_value("issizlik_orani", data["issizlik_orani"]),
-        "otomotiv_talep_degisimi": 1 - normalize_value("otomotiv_talep_degisimi", data["otomotiv_talep_degisimi"]),
-        "global_ticaret_gerilimi_index": normalize_value("global_ticaret_gerilimi_index", data["global_ticaret_gerilimi_index"]),
-        "politik_belirsizlik_skoru": normalize_value("politik_belirsizlik_skoru", data["politik_belirsizlik_skoru"]),
-        "guven_endeksi_degisimi": 1 - normalize_value("guven_endeksi_degisimi", data["guven_endeksi_degisimi"]),
-        "public_sentiment": 1 - ((data.get("public_sentiment", 0) + 1) / 2),
-    }
-
-    base_score = sum(risk_contributions[f] * weights[f] for f in weights)
-    if check_google_trends(["dolar ne olacak", "ekonomi kötü mü"]):
-        base_score += 0.05
-    adjustment, triggered = scenario_adjustment(data)
-    total = min(1.0, max(0.0, base_score + adjustment))
-    return total, triggered
+    row = [data.get(k, 0) if k == "public_sentiment" else data[k] for k in INDICATORS]
+    scores, triggered = calculate_risk_scores(np.array([row], dtype=float), trends_spike=trends_spike)
+    names = [name for name, hit in zip(SCENARIO_ENGINE.names, triggered[0]) if hit]
+    return float(scores[0]), names
 
 
 def plot_risk_indicator(current_risk_score: float):
     """Return a Plotly Figure showing the risk level."""
+    import plotly.graph_objects as go
+
     today = datetime.date.today()
     dates = [today - datetime.timedelta(days=i * 30) for i in range(3, 0, -1)] + [
         today + datetime.timedelta(days=i * 30) for i in range(7)
@@ -194,14 +426,23 @@ def plot_risk_indicator(current_risk_score: float):
 
 def main() -> None:
     """Run a single update of the risk indicator."""
+    import fx
+    from alerts import send_telegram
+    from market_watch import check_bist_crash
+    from sentiment_model import warm_up
+
     logging.basicConfig(level=logging.INFO)
     print("Türkiye Ekonomisi Kıyamet Saatini Başlatıyorum Kanka!")
+    # Model loading and a first TCMB backfill run outside the refresh budget
+    warm_up()
+    fx.warm_up()
     current_data = get_live_data()
     print("\nGüncel Veri Seti:")
     for key, value in current_data.items():
         print(f" {key}: {value:.2f}")
 
     risk_score, scenarios = calculate_risk_score(current_data)
+    record_snapshot(current_data, risk_score, scenarios)
     print(f"\nHesaplanan Güncel Risk Skoru: {risk_score:.2f}")
     if scenarios:
         print("Tetiklenen Senaryolar:", ", ".join(scenarios))
@@ -211,7 +452,7 @@ def main() -> None:
     print("\nKıyamet Saati göstergesi güncellendi.")
     if risk_score > 0.75:
         print("UYARI: Risk Seviyesi Yüksek! Piyasalar alarm veriyor.")
-        send_telegram("\u26a0\ufe0f Yüksek ekonomik risk tespit edildi!")
+        send_telegram("\u26a0\ufe0f Yüksek ekonomik risk tespit edildi!", key="high_risk")
     elif risk_score > 0.55:
         print("DİKKAT: Risk Seviyesi Orta! Gelişmeler takip edilmeli.")
     else:
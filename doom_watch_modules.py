@@ -1,9 +1,9 @@
 from typing import Dict, List
 
-import numpy as np
 import pandas as pd
 from sklearn.tree import DecisionTreeClassifier
-from transformers import pipeline
+
+from sentiment_model import score_texts
 
 
 def detect_anomalies(
@@ -45,20 +45,7 @@ def analyze_sentiment(texts: List[str]) -> float:
     if not texts:
         return 0.0
 
-    sentiment_pipeline = pipeline(
-        "sentiment-analysis",
-        model="savasy/bert-base-turkish-sentiment-cased",
-        tokenizer="savasy/bert-base-turkish-sentiment-cased",
-    )
-
-    scores = []
-    for text in texts:
-        result = sentiment_pipeline(text)[0]
-        label = result.get("label", "")
-        score = result.get("score", 0.0)
-        scores.append(score if "POS" in label.upper() else -score)
-
-    return float(np.mean(scores)) if scores else 0.0
+    return float(score_texts(texts).mean())
 
 
 def train_risk_rules(X: pd.DataFrame, y: List[int]):
@@ -0,0 +1,134 @@
+"""Parallel RSS ingestion with conditional GET and a per-feed entry cache."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+import feedparser
+
+from metrics import cache_lookup, timed
+from providers import get_provider
+
+FEED_TTL = 6 * 3600  # seconds an entry is kept after it was last seen
+FEED_WORKERS = 8
+
+
+def entry_text(entry) -> str:
+    """Return title plus summary/description of a feed entry."""
+    text = ""
+    if hasattr(entry, "title"):
+        text += entry.title
+    if hasattr(entry, "summary"):
+        text += " " + entry.summary
+    elif hasattr(entry, "description"):
+        text += " " + entry.description
+    return text.strip()
+
+
+def _published(entry) -> Tuple[int, ...]:
+    """Sort key putting the newest dated entries first; undated ones keep feed order."""
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    return tuple(parsed[:6]) if parsed else ()
+
+
+class FeedCache:
+    """Per-feed ETag/Last-Modified validators and parsed entries with TTL eviction.
+
+    Each feed keeps the entries of its latest download, newest first; they
+    expire ``ttl`` seconds after that download, so a feed that keeps failing
+    stops contributing stale items. Entries that left the feed are dropped.
+    """
+
+    def __init__(self, ttl: float = FEED_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._entries: Dict[str, Tuple[float, List[str]]] = {}
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Return the stored ``etag``/``modified`` values for a feed."""
+        with self._lock:
+            return dict(self._validators.get(url, {}))
+
+    def update(self, url: str, texts: List[str], etag: Optional[str] = None,
+               modified: Optional[str] = None) -> None:
+        """Store a fresh download of a feed, replacing its previous entries."""
+        now = time.time()
+        with self._lock:
+            validators = self._validators.setdefault(url, {})
+            if etag:
+                validators["etag"] = etag
+            if modified:
+                validators["modified"] = modified
+            self._entries[url] = (now, list(texts))
+
+    def touch(self, url: str) -> None:
+        """Mark a feed's entries as current after a 304 Not Modified."""
+        with self._lock:
+            if url in self._entries:
+                self._entries[url] = (time.time(), self._entries[url][1])
+
+    def texts(self, url: str) -> List[str]:
+        """Return the feed's current texts, newest first; empty once expired."""
+        with self._lock:
+            fetched, texts = self._entries.get(url, (0.0, []))
+            if fetched < time.time() - self.ttl:
+                self._entries.pop(url, None)
+                return []
+            return list(texts)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._validators.clear()
+            self._entries.clear()
+
+
+FEED_CACHE = FeedCache()
+
+
+@timed("fetch_feed")
+def fetch_feed(url: str, cache: FeedCache = FEED_CACHE) -> List[str]:
+    """Conditionally download one feed and return its current texts.
+
+    The download goes through the shared provider with If-None-Match /
+    If-Modified-Since headers. A 304 response or a failed download returns the
+    cached entries.
+    """
+    validators = cache.validators(url)
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("modified"):
+        headers["If-Modified-Since"] = validators["modified"]
+    try:
+        response = get_provider().get(url, headers=headers)
+        if response.status_code == 304:
+            cache_lookup("feed", 1, 0)
+            cache.touch(url)
+            return cache.texts(url)
+        cache_lookup("feed", 0, 1)
+        response.raise_for_status()
+        feed = feedparser.parse(response.content, response_headers=response.headers)
+        if feed.bozo:
+            logging.warning("RSS error %s: %s", url, feed.bozo_exception)
+            return cache.texts(url)
+        entries = sorted(feed.entries, key=_published, reverse=True)
+        texts = list(dict.fromkeys(t for t in (entry_text(e) for e in entries) if t))
+        cache.update(url, texts, etag=response.headers.get("etag"),
+                     modified=response.headers.get("last-modified"))
+        return cache.texts(url)
+    except Exception as exc:
+        logging.warning("feed parse failed for %s: %s", url, exc)
+        return cache.texts(url)
+
+
+def fetch_feeds(urls: List[str], cache: FeedCache = FEED_CACHE,
+                max_workers: int = FEED_WORKERS) -> Dict[str, List[str]]:
+    """Fetch feeds in parallel and return ``{url: texts}`` in input order."""
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        results = list(pool.map(lambda u: fetch_feed(u, cache), urls))
+    return dict(zip(urls, results))
@@ -0,0 +1,317 @@
+"""Realised FX volatility from TCMB's daily indicative rates.
+
+Daily ``ForexSelling`` rates are backfilled from TCMB's dated archive
+(``kurlar/YYYYMM/DDMMYYYY.xml``) in parallel and kept in a local
+TimeSeriesStore. Each file is read with ``iterparse``, stopping once the
+wanted currencies are found. ``FxVolatility`` keeps rolling log-return std
+and RiskMetrics-style EWMA volatility for USD/TRY, EUR/TRY and the 50/50
+basket, updated one day at a time, so a refresh downloads at most one file.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+import calendar
+import datetime
+import io
+import logging
+import math
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from config import DATA_DIR
+from rolling import RollingWindow
+from tsstore import TimeSeriesStore
+
+ARCHIVE_URL = "https://www.tcmb.gov.tr/kurlar/{month}/{day}.xml"
+TODAY_URL = "https://www.tcmb.gov.tr/kurlar/today.xml"
+CURRENCIES = ("USD", "EUR")
+BASKET = {"USD": 0.5, "EUR": 0.5}  # TCMB's currency basket weights
+BASKET_SERIES = "basket"
+EWMA_LAMBDA = 0.94
+VOL_WINDOW = 20  # business days in the rolling std
+BACKFILL_DAYS = 180  # calendar days fetched when the cache is empty
+GAP_BACKFILL_DAYS = 4  # longer gaps than a weekend plus a holiday are backfilled
+RECHECK = 3600  # seconds before today.xml is checked again for a new date
+FX_WORKERS = 8
+
+
+def parse_rates(content: bytes, codes: Iterable[str] = CURRENCIES) -> Tuple[Optional[float], Dict[str, float]]:
+    """Return ``(date_ts, {code: ForexSelling})`` from one TCMB XML file.
+
+    ``date_ts`` is midnight UTC of the bulletin date, or None when the file
+    carries no date.
+    """
+    wanted = set(codes)
+    date_ts: Optional[float] = None
+    rates: Dict[str, float] = {}
+    for event, elem in ET.iterparse(io.BytesIO(content), events=("start", "end")):
+        if event == "start":
+            if elem.tag == "Tarih_Date" and elem.get("Date"):
+                month, day, year = (int(p) for p in elem.get("Date").split("/"))
+                date_ts = float(calendar.timegm((year, month, day, 0, 0, 0)))
+            continue
+        if elem.tag == "Currency":
+            code = elem.get("CurrencyCode") or elem.get("Kod")
+            if code in wanted:
+                text = elem.findtext("ForexSelling")
+                if text and text.strip():
+                    rates[code] = float(text)
+            elem.clear()
+            if wanted <= rates.keys():
+                break
+    return date_ts, rates
+
+
+def archive_url(day: datetime.date) -> str:
+    return ARCHIVE_URL.format(month=day.strftime("%Y%m"), day=day.strftime("%d%m%Y"))
+
+
+def fetch_rates(url: str, codes: Iterable[str] = CURRENCIES) -> Optional[Tuple[float, Dict[str, float]]]:
+    """Download and parse one file; None for missing days (weekends, holidays)."""
+    from providers import get_provider
+
+    try:
+        response = get_provider().get(url)
+        if response.status_code != 200:
+            return None
+        date_ts, rates = parse_rates(response.content, codes)
+    except Exception as exc:
+        logging.warning("tcmb rates fetch failed for %s: %s", url, exc)
+        return None
+    if date_ts is None or not rates:
+        return None
+    return date_ts, rates
+
+
+class _Series:
+    """Incremental log-return statistics for one rate series."""
+
+    def __init__(self, window: int, lam: float):
+        self.lam = lam
+        self.returns = RollingWindow(window)
+        self.last: Optional[float] = None
+        self.ewma_var: Optional[float] = None
+
+    def update(self, price: float) -> None:
+        if not price or math.isnan(price) or price <= 0:
+            return
+        if self.last is not None:
+            r = math.log(price / self.last)
+            self.returns.append(r)
+            # Seed with the first squared return, then the RiskMetrics recursion
+            self.ewma_var = r * r if self.ewma_var is None else self.lam * self.ewma_var + (1 - self.lam) * r * r
+        self.last = price
+
+    def rolling(self) -> float:
+        return float(self.returns.std) if len(self.returns) >= 2 else float("nan")
+
+    def ewma(self) -> float:
+        return math.sqrt(self.ewma_var) if self.ewma_var is not None else float("nan")
+
+
+class FxVolatility:
+    """Cached TCMB rates plus incrementally updated daily volatility.
+
+    Volatilities are daily (not annualised) standard deviations of log
+    returns for each currency and for ``BASKET_SERIES``.
+    """
+
+    def __init__(self, store: Optional[TimeSeriesStore] = None, window: int = VOL_WINDOW,
+                 lam: float = EWMA_LAMBDA, currencies: Iterable[str] = CURRENCIES,
+                 basket: Optional[Dict[str, float]] = None):
+        self.store = TimeSeriesStore(os.path.join(DATA_DIR, "fx")) if store is None else store
+        self.currencies = tuple(currencies)
+        self.basket = dict(BASKET if basket is None else basket)
+        self.window = window
+        self.lam = lam
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._series: Dict[str, _Series] = {}
+        self._last_ts: Optional[float] = None
+        self._replay()
+
+    def _replay(self) -> None:
+        self._series = {k: _Series(self.window, self.lam) for k in self.currencies + (BASKET_SERIES,)}
+        self._last_ts = None
+        ts, cols = self.store.read(columns=self.currencies)
+        for i in range(len(ts)):
+            self._update(float(ts[i]), {k: float(cols[k][i]) for k in self.currencies})
+
+    def _basket_rate(self, rates: Dict[str, float]) -> float:
+        if not all(k in rates and rates[k] > 0 for k in self.basket):
+            return float("nan")
+        return sum(w * rates[k] for k, w in self.basket.items())
+
+    def _update(self, ts: float, rates: Dict[str, float]) -> None:
+        for code in self.currencies:
+            self._series[code].update(rates.get(code, float("nan")))
+        self._series[BASKET_SERIES].update(self._basket_rate(rates))
+        self._last_ts = ts
+
+    def extend(self, rows: Iterable[Tuple[float, Dict[str, float]]]) -> int:
+        """Store days newer than the cache in one append and update the statistics.
+
+        Returns the number of days added.
+        """
+        rows = sorted(rows, key=lambda row: row[0])
+        rows = [(ts, rates) for ts, rates in rows if self._last_ts is None or ts > self._last_ts]
+        rows = list(dict(rows).items())  # one row per date
+        if not rows:
+            return 0
+        self.store.append_many([ts for ts, _ in rows],
+                               {k: [rates.get(k, float("nan")) for _, rates in rows] for k in self.currencies})
+        for ts, rates in rows:
+            self._update(ts, rates)
+        return len(rows)
+
+    def add(self, ts: float, rates: Dict[str, float]) -> bool:
+        """Store one day's rates; False if the day is not newer than the cache."""
+        return self.extend([(ts, rates)]) > 0
+
+    @property
+    def last_date(self) -> Optional[datetime.date]:
+        if self._last_ts is None:
+            return None
+        return datetime.datetime.fromtimestamp(self._last_ts, datetime.timezone.utc).date()
+
+    def backfill(self, start: datetime.date, end: Optional[datetime.date] = None,
+                 workers: int = FX_WORKERS) -> int:
+        """Fetch archive files for business days in ``start..end`` in parallel.
+
+        Returns the number of days added. Days already cached are skipped.
+        """
+        end = end or datetime.date.today()
+        days = [start + datetime.timedelta(d) for d in range((end - start).days + 1)]
+        days = [d for d in days if d.weekday() < 5 and (self.last_date is None or d > self.last_date)]
+        if not days:
+            return 0
+        with ThreadPoolExecutor(max_workers=min(workers, len(days)), thread_name_prefix="fx-backfill") as pool:
+            results = list(pool.map(lambda d: fetch_rates(archive_url(d), self.currencies), days))
+        return self.extend(r for r in results if r is not None)
+
+    def needs_backfill(self, now: Optional[float] = None) -> bool:
+        """True if the cache is empty or more than ``GAP_BACKFILL_DAYS`` behind."""
+        today = datetime.datetime.fromtimestamp(time.time() if now is None else now, datetime.timezone.utc).date()
+        last = self.last_date
+        return last is None or (today - last).days > GAP_BACKFILL_DAYS
+
+    def refresh(self, now: Optional[float] = None) -> bool:
+        """Bring the cache up to date; returns True if a new day was added.
+
+        An empty cache is backfilled over ``BACKFILL_DAYS`` and a gap longer
+        than ``GAP_BACKFILL_DAYS`` from the archive; otherwise today.xml is
+        downloaded, plus archive files for any business days it skips past,
+        and not more often than every ``RECHECK`` seconds. Raises RuntimeError
+        if another refresh is running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("fx refresh already in progress")
+        try:
+            now = time.time() if now is None else now
+            today = datetime.datetime.fromtimestamp(now, datetime.timezone.utc).date()
+            last = self.last_date
+            if (last is not None and last >= today) or now - self._checked < RECHECK:
+                return False
+            self._checked = now
+            if last is None or (today - last).days > GAP_BACKFILL_DAYS:
+                start = today - datetime.timedelta(BACKFILL_DAYS) if last is None else last
+                return self.backfill(start, today) > 0
+            result = fetch_rates(TODAY_URL, self.currencies)
+            if result is None:
+                return False
+            # Business days between the cached one and the latest bulletin come
+            # from the archive so each keeps its own daily return
+            bulletin = datetime.datetime.fromtimestamp(result[0], datetime.timezone.utc).date()
+            added = self.backfill(last, bulletin - datetime.timedelta(1))
+            return self.add(*result) or added > 0
+        finally:
+            self._lock.release()
+
+    def volatility(self, series: str = BASKET_SERIES, method: str = "ewma") -> float:
+        """Daily volatility of ``series`` by ``"ewma"`` or ``"rolling"`` std."""
+        s = self._series[series]
+        if method == "ewma":
+            return s.ewma()
+        if method == "rolling":
+            return s.rolling()
+        raise ValueError(f"unknown volatility method {method!r}")
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return ``{"<series>_ewma": ..., "<series>_rolling": ..., "<code>": rate}``."""
+        out: Dict[str, float] = {}
+        for name, s in self._series.items():
+            out[f"{name}_ewma"] = s.ewma()
+            out[f"{name}_rolling"] = s.rolling()
+            if name != BASKET_SERIES and s.last is not None:
+                out[name] = s.last
+        return out
+
+    def history(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Return cached rates as ``(ts, {code: rates})``."""
+        return self.store.read(start, end, self.currencies)
+
+
+_FX: Optional[FxVolatility] = None
+_FX_LOCK = threading.Lock()
+
+
+def get_fx() -> FxVolatility:
+    """Return the process-wide FxVolatility backed by ``DATA_DIR/fx``."""
+    global _FX
+    if _FX is None:
+        with _FX_LOCK:
+            if _FX is None:
+                _FX = FxVolatility()
+    return _FX
+
+
+_WARM_UP: Optional[threading.Thread] = None
+
+
+def warm_up(background: bool = False) -> None:
+    """Run the archive backfill ahead of scoring, optionally in a thread.
+
+    Only one background backfill runs at a time.
+    """
+    global _WARM_UP
+
+    def _load() -> None:
+        try:
+            get_fx().refresh()
+        except RuntimeError:
+            pass  # another refresh is already filling the cache
+        except Exception as exc:
+            logging.warning("fx warm-up failed: %s", exc)
+
+    if not background:
+        _load()
+        return
+    with _FX_LOCK:
+        if _WARM_UP is None or not _WARM_UP.is_alive():
+            _WARM_UP = threading.Thread(target=_load, name="fx-warm-up", daemon=True)
+            _WARM_UP.start()
+
+
+def basket_volatility() -> float:
+    """Refresh the cache and return the basket's daily EWMA volatility.
+
+    A backfill (empty cache or a long gap) is handed to ``warm_up`` in the
+    background so it never holds up a scoring refresh; meanwhile the cached
+    value is used, or ValueError is raised if there is none yet.
+    """
+    fx = get_fx()
+    if fx.needs_backfill():
+        warm_up(background=True)
+    else:
+        try:
+            fx.refresh()
+        except RuntimeError:
+            pass  # a backfill is running; use what is cached
+    vol = fx.volatility()
+    if math.isnan(vol):
+        raise ValueError("not enough FX history for volatility")
+    return vol
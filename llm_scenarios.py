@@ -2,6 +2,7 @@
 
 import openai
 from config import OPENAI_API_KEY
+from providers import get_provider
 
 openai.api_key = OPENAI_API_KEY
 
@@ -9,7 +10,9 @@ openai.api_key = OPENAI_API_KEY
 def generate_scenario(prompt: str) -> str:
     """Return LLM-generated scenario text."""
     try:
-        response = openai.ChatCompletion.create(
+        response = get_provider().call(
+            "api.openai.com",
+            openai.ChatCompletion.create,
             model="gpt-4",
             messages=[{"role": "user", "content": prompt}],
             timeout=10,
@@ -1,39 +1,374 @@
 """Market monitoring utilities for BIST and search trends."""
 
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
 import logging
-import pandas as pd
-import yfinance as yf
-from pytrends.request import TrendReq
+import os
+import threading
+import time
+import warnings
 
-from alerts import send_telegram
+import numpy as np
 
+from metrics import timed
+from tsstore import TimeSeriesStore
 
+# pandas, yfinance, pytrends and alerts are imported on first use so that
+# reading the cached TRENDS flag does not pull them in
+if TYPE_CHECKING:
+    import pandas as pd
+
+TRENDS_KEYWORDS = ["dolar ne olacak", "ekonomi kötü mü"]
+TRENDS_TTL = 6 * 3600  # seconds
+TRENDS_RETRY = 300  # seconds between attempts after a failed download
+
+BIST_TICKER = "XU100.IS"
+# ticker -> display name and risk direction (+1: a fall is adverse, -1: a rise is)
+UNIVERSE: Dict[str, Dict] = {
+    BIST_TICKER: {"name": "BIST 100", "direction": 1},
+    "XBANK.IS": {"name": "BIST Banka", "direction": 1},
+    "USDTRY=X": {"name": "USD/TRY", "direction": -1},
+    "EURTRY=X": {"name": "EUR/TRY", "direction": -1},
+    # No free CDS feed on Yahoo; the MSCI Turkey ETF trades the same risk in USD
+    "TUR": {"name": "iShares MSCI Turkey (CDS proxy)", "direction": 1},
+}
+MARKET_INTERVAL = "1m"
+HISTORY_PERIOD = {"1m": "5d", "2m": "1mo", "5m": "1mo", "15m": "1mo", "1h": "3mo", "1d": "1y"}
+OHLC_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+RETURN_TRIGGER = -0.05  # adverse move against the previous session close
+DRAWDOWN_TRIGGER = -0.05  # adverse move from the session high (low for direction -1)
+MIN_FETCH_INTERVAL = 60  # seconds between downloads
+LOOKBACK_DAYS = 7  # history read for signals; covers weekends and holidays
+SESSION_OFFSET = 3 * 3600  # Istanbul is UTC+3; sessions split at local midnight
+
+
+class MarketMonitor:
+    """Watches a universe of tickers from one batched yfinance download.
+
+    Completed bars are cached per ticker in a TimeSeriesStore, so each update
+    only asks Yahoo for bars after the newest cached one; the latest (possibly
+    still forming) bar is kept in memory. Day returns and intraday drawdowns
+    are computed for all tickers at once on a bar-aligned matrix.
+    ``direction`` is +1 where a fall is the risk and -1 where a rise is (FX,
+    CDS proxies), so one pair of negative thresholds covers both.
+    """
+
+    def __init__(self, universe: Optional[Dict[str, Dict]] = None, interval: str = MARKET_INTERVAL,
+                 return_trigger: float = RETURN_TRIGGER, drawdown_trigger: float = DRAWDOWN_TRIGGER,
+                 root: Optional[str] = None, min_fetch_interval: float = MIN_FETCH_INTERVAL):
+        from config import DATA_DIR
+
+        self.universe = dict(UNIVERSE if universe is None else universe)
+        self.tickers = list(self.universe)
+        self.direction = np.array([self.universe[t].get("direction", 1) for t in self.tickers], dtype=float)
+        self.interval = interval
+        self.return_trigger = return_trigger
+        self.drawdown_trigger = drawdown_trigger
+        self.min_fetch_interval = min_fetch_interval
+        self.root = os.path.join(DATA_DIR, "market", interval) if root is None else root
+        self._stores: Dict[str, TimeSeriesStore] = {}
+        self._live: Dict[str, Tuple[float, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+        self._fetched = 0.0
+
+    def store(self, ticker: str) -> TimeSeriesStore:
+        if ticker not in self._stores:
+            safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker)
+            self._stores[ticker] = TimeSeriesStore(os.path.join(self.root, safe))
+        return self._stores[ticker]
+
+    def _download(self, tickers: List[str], start: Optional[float]) -> "pd.DataFrame":
+        import yfinance as yf
+        from providers import get_provider
+
+        if start is None:
+            kwargs = {"period": HISTORY_PERIOD.get(self.interval, "1mo")}
+        else:
+            import datetime
+
+            kwargs = {"start": datetime.datetime.fromtimestamp(start, datetime.timezone.utc)}
+        return get_provider().call(
+            "query1.finance.yahoo.com", yf.download, tickers, interval=self.interval,
+            group_by="column", auto_adjust=False, progress=False, threads=True, **kwargs,
+        )
+
+    def update(self, force: bool = False) -> int:
+        """Download new bars for every ticker; return bars stored.
+
+        Tickers with stored bars share one request from the oldest last bar;
+        tickers with an empty store are backfilled over ``HISTORY_PERIOD`` in
+        a second request. Calls within ``min_fetch_interval`` seconds of the
+        last download are skipped unless ``force`` is set.
+        """
+        with self._lock:
+            now = time.time()
+            if not force and now - self._fetched < self.min_fetch_interval:
+                return 0
+            self._fetched = now
+            lasts = {t: self.store(t).last_timestamp() for t in self.tickers}
+            empty = [t for t in self.tickers if lasts[t] is None]
+            cached = [t for t in self.tickers if lasts[t] is not None]
+            groups = [(empty, None), (cached, min((lasts[t] for t in cached), default=None))]
+            return sum(self._store_frame(tickers, self._download(tickers, start))
+                       for tickers, start in groups if tickers)
+
+    def _store_frame(self, tickers: List[str], frame: "pd.DataFrame") -> int:
+        """Store the completed bars of ``frame`` per ticker and keep its newest bar live."""
+        if frame is None or frame.empty:
+            return 0
+        ts = np.array([t.timestamp() for t in frame.index], dtype=float)
+        stored = 0
+        for ticker in tickers:
+            cols = {}
+            for field in OHLC_FIELDS:
+                try:
+                    series = frame[field][ticker] if frame.columns.nlevels > 1 else frame[field]
+                except KeyError:
+                    series = None
+                cols[field] = np.full(len(ts), np.nan) if series is None else series.to_numpy(dtype=float)
+            valid = ~np.isnan(cols["Close"])
+            if not valid.any():
+                continue
+            rows = np.flatnonzero(valid)
+            # The newest bar may still be forming: keep it in memory only
+            *done, live = rows
+            self._live[ticker] = (float(ts[live]), {f: float(cols[f][live]) for f in OHLC_FIELDS})
+            last = self.store(ticker).last_timestamp()
+            done = [i for i in done if last is None or ts[i] > last]
+            if done:
+                self.store(ticker).append_many(ts[done], {f: cols[f][done] for f in OHLC_FIELDS})
+                stored += len(done)
+        return stored
+
+    def matrix(self, fields: Sequence[str] = ("Close",),
+               since: Optional[float] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Return ``(ts, {field: values})``, one column per ticker on the union of bar times.
+
+        Includes the in-memory live bar; missing bars are NaN.
+        """
+        series = []
+        for ticker in self.tickers:
+            ts, cols = self.store(ticker).read(since, None, fields)
+            ts = np.asarray(ts)
+            cols = {f: np.asarray(cols[f]) for f in fields}
+            live = self._live.get(ticker)
+            if live is not None and (not len(ts) or live[0] > ts[-1]):
+                ts = np.append(ts, live[0])
+                cols = {f: np.append(cols[f], live[1][f]) for f in fields}
+            series.append((ts, cols))
+        grid = np.unique(np.concatenate([ts for ts, _ in series])) if series else np.empty(0)
+        out = {f: np.full((len(grid), len(series)), np.nan) for f in fields}
+        for j, (ts, cols) in enumerate(series):
+            rows = np.searchsorted(grid, ts)
+            for f in fields:
+                out[f][rows, j] = cols[f]
+        return grid, out
+
+    def signals(self) -> Dict[str, np.ndarray]:
+        """Per-ticker last price, day return, intraday drawdown and trigger flags.
+
+        The day return compares the last price with the previous session's
+        last close; the drawdown is measured from the session high (or, for
+        ``direction`` -1, the rise from the session low). Both are signed so
+        that negative means adverse.
+        """
+        newest = [self.store(t).last_timestamp() for t in self.tickers] + [live[0] for live in self._live.values()]
+        newest = [t for t in newest if t is not None]
+        since = max(newest) - LOOKBACK_DAYS * 86400 if newest else None
+        ts, cols = self.matrix(("Close", "High", "Low"), since)
+        close, high, low = cols["Close"], cols["High"], cols["Low"]
+        n = len(self.tickers)
+        empty = np.full(n, np.nan)
+        if not len(ts):
+            return {"tickers": np.array(self.tickers), "last": empty, "day_return": empty,
+                    "drawdown": empty, "triggered": np.zeros(n, dtype=bool)}
+
+        filled = _ffill(close)
+        last = filled[-1]
+        session = np.floor((ts + SESSION_OFFSET) / 86400)
+        valid = ~np.isnan(close)
+        # Each ticker's current session is the one holding its newest bar
+        last_row = np.where(valid.any(axis=0), len(ts) - 1 - np.argmax(valid[::-1], axis=0), 0)
+        current = session[last_row]
+        in_session = session[:, None] == current[None, :]
+        before = (session[:, None] < current[None, :]) & valid
+        prev_row = np.where(before.any(axis=0), len(ts) - 1 - np.argmax(before[::-1], axis=0), -1)
+        prev_close = np.where(prev_row >= 0, close[np.maximum(prev_row, 0), np.arange(n)], np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # tickers with no bars today
+            day_high = np.nanmax(np.where(in_session, high, np.nan), axis=0)
+            day_low = np.nanmin(np.where(in_session, low, np.nan), axis=0)
+            day_return = self.direction * (last / prev_close - 1)
+            drawdown = np.where(self.direction > 0, last / day_high - 1, 1 - last / day_low)
+        with np.errstate(invalid="ignore"):
+            triggered = (day_return <= self.return_trigger) | (drawdown <= self.drawdown_trigger)
+        return {"tickers": np.array(self.tickers), "last": last, "day_return": day_return,
+                "drawdown": drawdown, "triggered": triggered}
+
+    def check(self, alert: bool = True) -> List[str]:
+        """Update, evaluate triggers and alert once per triggered ticker."""
+        self.update()
+        sig = self.signals()
+        hits = [t for t, flag in zip(self.tickers, sig["triggered"]) if flag]
+        if alert and hits:
+            from alerts import send_telegram
+
+            for i, ticker in enumerate(self.tickers):
+                if sig["triggered"][i]:
+                    name = self.universe[ticker].get("name", ticker)
+                    # Report the raw move, not the direction-adjusted one
+                    day, intraday = self.direction[i] * sig["day_return"][i], self.direction[i] * sig["drawdown"][i]
+                    send_telegram(f"\U0001F6A8 {name}: günlük {day:+.1%}, gün içi {intraday:+.1%}",
+                                  key=f"market:{ticker}")
+        return hits
+
+
+def _ffill(matrix: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down each column."""
+    idx = np.where(~np.isnan(matrix), np.arange(len(matrix))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return matrix[idx, np.arange(matrix.shape[1])]
+
+
+_MONITOR: Optional[MarketMonitor] = None
+_MONITOR_LOCK = threading.Lock()
+
+
+def get_monitor() -> MarketMonitor:
+    """Return the process-wide MarketMonitor over UNIVERSE."""
+    global _MONITOR
+    with _MONITOR_LOCK:
+        if _MONITOR is None:
+            _MONITOR = MarketMonitor()
+        return _MONITOR
+
+
+@timed("check_bist_crash")
 def check_bist_crash(threshold: float = -0.05) -> bool:
-    """Return True and alert if BIST-100 drops beyond threshold."""
+    """Return True and alert if BIST-100 drops beyond threshold.
+
+    Uses the shared MarketMonitor, so the check costs at most one batched
+    download of new bars for the whole universe.
+    """
+    from alerts import send_telegram
+
     try:
-        bist = yf.Ticker("XU100.IS")
-        df = bist.history(period="2d")
-        pct = df["Close"].pct_change().iloc[-1]
+        monitor = get_monitor()
+        monitor.update()
+        sig = monitor.signals()
+        pct = sig["day_return"][monitor.tickers.index(BIST_TICKER)]
         if pct < threshold:
-            send_telegram("\U0001F6A8 BIST DROPPING 5%!")
+            send_telegram("\U0001F6A8 BIST DROPPING 5%!", key="bist_crash")
             return True
     except Exception as exc:
         logging.warning("bist check failed: %s", exc)
     return False
 
 
+@timed("fetch_google_trends")
+def fetch_google_trends(keywords: List[str]) -> "pd.DataFrame":
+    """Download 12 months of search interest for keywords."""
+    from pytrends.request import TrendReq
+
+    pytrends = TrendReq(hl="tr", timeout=(5, 15))
+    pytrends.build_payload(keywords, timeframe="today 12-m")
+    return pytrends.interest_over_time()
+
+
+def _trends_spike(data: "pd.DataFrame", keywords: List[str]) -> bool:
+    if data.empty:
+        return False
+    scores = data[keywords].iloc[-1]
+    return bool((scores / data[keywords].max()).max() > 0.8)
+
+
+@timed("check_google_trends")
 def check_google_trends(keywords: List[str]) -> bool:
     """Check if search interest spikes above 80% of 12-month max."""
     try:
-        pytrends = TrendReq(hl="tr", timeout=(5, 15))
-        pytrends.build_payload(keywords, timeframe="today 12-m")
-        data = pytrends.interest_over_time()
-        if data.empty:
-            return False
-        scores = data[keywords].iloc[-1]
-        if (scores / data[keywords].max()).max() > 0.8:
-            return True
+        return _trends_spike(fetch_google_trends(keywords), keywords)
     except Exception as exc:
         logging.warning("google trends failed: %s", exc)
     return False
+
+
+class TrendsPoller:
+    """Keeps the Google Trends spike flag fresh in the background.
+
+    Readers get the cached flag and series immediately; a stale or empty cache
+    only schedules a refresh on a worker thread and never blocks the caller.
+    """
+
+    def __init__(self, keywords: List[str], ttl: float = TRENDS_TTL):
+        self.keywords = list(keywords)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._spike = False
+        self._series: Optional["pd.DataFrame"] = None
+        self._updated: Optional[float] = None
+        self._refreshing = False
+        self._attempted = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        """Download the series now and update the cache; return the spike flag."""
+        try:
+            data = fetch_google_trends(self.keywords)
+            spike = _trends_spike(data, self.keywords)
+            with self._lock:
+                self._series, self._spike, self._updated = data, spike, time.time()
+        except Exception as exc:
+            logging.warning("google trends failed: %s", exc)
+        finally:
+            with self._lock:
+                self._refreshing = False
+        return self._spike
+
+    def _refresh_async(self) -> None:
+        with self._lock:
+            if self._refreshing or time.time() - self._attempted < TRENDS_RETRY:
+                return
+            self._refreshing = True
+            self._attempted = time.time()
+        threading.Thread(target=self.refresh, name="trends-refresh", daemon=True).start()
+
+    def start(self) -> None:
+        """Poll every ``ttl`` seconds on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.is_set():
+                self.refresh()
+                self._stop.wait(self.ttl)
+
+        self._thread = threading.Thread(target=_loop, name="trends-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful download, or None if never."""
+        return None if self._updated is None else time.time() - self._updated
+
+    def _check_stale(self) -> None:
+        age = self.age
+        polling = self._thread is not None and self._thread.is_alive()
+        if not polling and (age is None or age > self.ttl):
+            self._refresh_async()
+
+    def spike(self) -> bool:
+        """Return the cached spike flag (False until the first download)."""
+        self._check_stale()
+        return self._spike
+
+    def series(self) -> Optional["pd.DataFrame"]:
+        """Return the cached interest-over-time frame."""
+        self._check_stale()
+        return self._series
+
+
+TRENDS = TrendsPoller(TRENDS_KEYWORDS)
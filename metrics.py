@@ -0,0 +1,318 @@
+"""In-process metrics for the scoring pipeline.
+
+Counters, gauges and latency histograms live in one thread-safe registry and
+are exported as Prometheus text (``prometheus_text``) or a JSON-ready dict
+(``snapshot``); ``service.py`` serves both. ``timed`` works as a decorator or
+a context manager, and ``profile_call`` runs one call under cProfile.
+
+    python metrics.py --profile   # profile a single refresh, then dump metrics
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import functools
+import io
+import threading
+import time
+
+PREFIX = "doom_watch_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _Key:
+    return PREFIX + name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _labels(pairs: Tuple[Tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in pairs]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram with sum and count."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile (None if empty)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Registry:
+    """Thread-safe store of counters, gauges and histograms keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[_Key, float] = {}
+        self.gauges: Dict[_Key, float] = {}
+        self.histograms: Dict[_Key, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self.gauges[_key(name, labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({k[0] for k in series}):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for (n, pairs), value in sorted(series.items()):
+                        if n == name:
+                            lines.append(f"{name}{_labels(pairs)} {value:g}")
+            for name in sorted({k[0] for k in self.histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, pairs), hist in sorted(self.histograms.items(), key=lambda kv: kv[0]):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+                        cumulative += count
+                        le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                        lines.append(f"{name}_bucket{_labels(pairs, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(pairs)} {hist.sum:g}")
+                    lines.append(f"{name}_count{_labels(pairs)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-ready dump, with cache hit rates derived from the counters."""
+        def flat(key: _Key) -> str:
+            return key[0] + _labels(key[1])
+
+        with self._lock:
+            out: Dict[str, Any] = {
+                "counters": {flat(k): v for k, v in sorted(self.counters.items())},
+                "gauges": {flat(k): v for k, v in sorted(self.gauges.items())},
+                "histograms": {
+                    flat(k): {
+                        "count": h.count,
+                        "sum": h.sum,
+                        "mean": h.sum / h.count if h.count else None,
+                        "p50": h.quantile(0.5),
+                        "p95": h.quantile(0.95),
+                    }
+                    for k, h in sorted(self.histograms.items(), key=lambda kv: kv[0])
+                },
+            }
+            lookups: Dict[str, Dict[str, float]] = {}
+            for (name, pairs), value in self.counters.items():
+                if name == PREFIX + "cache_requests_total":
+                    labels = dict(pairs)
+                    lookups.setdefault(labels.get("cache", ""), {})[labels.get("result", "")] = value
+        out["cache_hit_rates"] = {
+            cache: counts.get("hit", 0.0) / sum(counts.values()) for cache, counts in lookups.items()
+            if sum(counts.values())
+        }
+        return out
+
+
+REGISTRY = Registry()
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    REGISTRY.inc(name, value, **labels)
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    REGISTRY.set_gauge(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    REGISTRY.observe(name, value, **labels)
+
+
+def cache_lookup(cache: str, hits: int, misses: int) -> None:
+    """Count cache hits and misses; ``snapshot`` turns them into hit rates."""
+    if hits:
+        inc("cache_requests_total", hits, cache=cache, result="hit")
+    if misses:
+        inc("cache_requests_total", misses, cache=cache, result="miss")
+
+
+class timed:
+    """Record a stage's latency (and failures) as a decorator or context manager.
+
+        @timed("get_live_data")
+        def get_live_data(): ...
+
+        with timed("source", source="tcmb"):
+            ...
+    """
+
+    def __init__(self, stage: str, metric: str = "stage_seconds", **labels):
+        self.metric = metric
+        self.labels = dict(labels, stage=stage)
+        self._start = 0.0
+
+    def __enter__(self) -> "timed":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        observe(self.metric, time.perf_counter() - self._start, **self.labels)
+        if exc_type is not None:
+            inc("stage_errors_total", **self.labels)
+
+    def __call__(self, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(metric=self.metric, **self.labels):
+                return _run_profiled(fn, args, kwargs)
+
+        return wrapper
+
+
+def prometheus_text() -> str:
+    return REGISTRY.prometheus_text()
+
+
+def snapshot() -> Dict[str, Any]:
+    return REGISTRY.snapshot()
+
+
+# Profiles of timed stages that ran in worker threads during profile_call
+_PROFILES: Optional[List[Any]] = None
+_PROFILES_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+def _run_profiled(fn: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+    """Call ``fn``, under its own profiler if profile_call is active elsewhere.
+
+    cProfile only sees the thread it runs in, so stages running on pool
+    threads are profiled here and merged by profile_call. Python 3.12+
+    allows a single active profiler; there ``fn`` runs unprofiled.
+    """
+    if _PROFILES is None or getattr(_LOCAL, "profiling", False):
+        return fn(*args, **kwargs)
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiler is already active
+        return fn(*args, **kwargs)
+    _LOCAL.profiling = True
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        _LOCAL.profiling = False
+        with _PROFILES_LOCK:
+            if _PROFILES is not None:
+                _PROFILES.append(profiler)
+
+
+_PROFILE_CALL_LOCK = threading.Lock()
+
+
+def profile_call(fn: Callable, *args, path: Optional[str] = None, sort: str = "cumulative",
+                 limit: int = 30, **kwargs) -> Tuple[Any, str]:
+    """Run ``fn`` under cProfile and return ``(result, stats_text)``.
+
+    Timed stages that run on other threads meanwhile (e.g. the sources of
+    get_live_data) are profiled too and merged into the report. With
+    ``path`` the merged stats are also written there for snakeviz/pstats.
+    If another profile is running, ``fn`` runs unprofiled and the report
+    says so.
+    """
+    import cProfile
+    import pstats
+
+    global _PROFILES
+    if not _PROFILE_CALL_LOCK.acquire(blocking=False):
+        return fn(*args, **kwargs), "profiling unavailable: another profile is running"
+    try:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as exc:
+            return fn(*args, **kwargs), f"profiling unavailable: {exc}"
+        with _PROFILES_LOCK:
+            _PROFILES = []
+        _LOCAL.profiling = True
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            _LOCAL.profiling = False
+            with _PROFILES_LOCK:
+                workers, _PROFILES = _PROFILES, None
+    finally:
+        _PROFILE_CALL_LOCK.release()
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream=out)
+    for worker in workers:
+        stats.add(worker)
+    if path:
+        stats.dump_stats(path)
+    stats.sort_stats(sort).print_stats(limit)
+    return result, out.getvalue()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import logging
+
+    parser = argparse.ArgumentParser(description="Run one refresh and print its metrics")
+    parser.add_argument("--profile", action="store_true", help="run the refresh under cProfile")
+    parser.add_argument("--out", help="write raw cProfile stats here")
+    parser.add_argument("--json", action="store_true", help="print the JSON dump instead of Prometheus text")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    import doom_watch as dw
+
+    def _refresh():
+        data = dw.get_live_data()
+        return dw.calculate_risk_score(data)
+
+    if args.profile or args.out:
+        _, report = profile_call(_refresh, path=args.out)
+        print(report)
+    else:
+        _refresh()
+    print(json.dumps(snapshot(), indent=2) if args.json else prometheus_text())
@@ -1,8 +1,11 @@
 # Momentum feature calculations for economic data.
-from typing import Dict, List
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+import warnings
 
 import numpy as np
 
+from tsstore import TimeSeriesStore, get_store, indicator_columns
+
 
 def calc_momentum_features(data_window: List[Dict[str, float]]) -> Dict[str, float]:
     """Return simple trend and volatility acceleration features."""
@@ -20,3 +23,126 @@ def calc_momentum_features(data_window: List[Dict[str, float]]) -> Dict[str, flo
     vol_acc = last_std - first_std
 
     return {"trend": trend, "vol_acceleration": vol_acc}
+
+
+def stored_momentum_features(window: int = 30, store: Optional[TimeSeriesStore] = None) -> Dict[str, float]:
+    """Return momentum features over the last ``window`` stored snapshots."""
+    store = get_store() if store is None else store
+    return calc_momentum_features(store.records(window, indicator_columns(store)))
+
+
+MOMENTUM_WINDOWS = (5, 20, 60)
+FEATURES = ("trend", "ema_slope", "volatility", "vol_acceleration")
+_RESYNC_EVERY = 10_000  # updates between exact recomputes of rolling sums
+
+
+class MomentumEngine:
+    """Streaming per-indicator momentum features over several window lengths.
+
+    Each update is O(windows * indicators): trends come from a ring buffer of
+    past values, EMAs are updated in place, and rolling volatility of first
+    differences uses running sums. ``features`` is a read-only view with shape
+    ``(len(FEATURES), len(windows), len(keys))``; it is updated in place, so
+    callers can hold on to it between snapshots.
+    """
+
+    def __init__(self, keys: Iterable[str], windows: Sequence[int] = MOMENTUM_WINDOWS):
+        self.keys: List[str] = list(keys)
+        self.windows = np.array(sorted(windows), dtype=int)
+        k, nw, depth = len(self.keys), len(self.windows), int(self.windows.max())
+        self._depth = depth
+        self._alpha = 2.0 / (self.windows + 1.0)
+        self._values = np.full((depth + 1, k), np.nan)
+        self._diffs = np.zeros((depth, k))
+        self._vols = np.full((depth + 1, nw, k), np.nan)
+        self._ema = np.full((nw, k), np.nan)
+        self._sum = np.zeros((nw, k))
+        self._sumsq = np.zeros((nw, k))
+        self._last = np.full(k, np.nan)
+        self.count = 0
+        self._features = np.full((len(FEATURES), nw, k), np.nan)
+
+    @property
+    def features(self) -> np.ndarray:
+        view = self._features.view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def aggregate(self) -> np.ndarray:
+        """Mean of each feature across indicators, shape ``(len(FEATURES), len(windows))``."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # features still NaN while warming up
+            return np.nanmean(self._features, axis=2)
+
+    def update(self, snapshot: Mapping[str, float]) -> np.ndarray:
+        """Add one snapshot (missing indicators carry forward) and return ``features``."""
+        x = np.array([snapshot.get(key, np.nan) for key in self.keys], dtype=float)
+        x = np.where(np.isnan(x), self._last, x)
+        t = self.count
+        diff = np.nan_to_num(x - self._last) if t else np.zeros_like(x)
+
+        if t:
+            slot = t % self._depth
+            for i, w in enumerate(self.windows):
+                if t > w:
+                    leaving = self._diffs[(t - w) % self._depth]
+                    self._sum[i] -= leaving
+                    self._sumsq[i] -= leaving * leaving
+            self._diffs[slot] = diff
+            self._sum += diff
+            self._sumsq += diff * diff
+        self._values[t % (self._depth + 1)] = x
+        self.count = t + 1
+        if self.count % _RESYNC_EVERY == 0:
+            self._resync()
+
+        prev_ema = self._ema.copy()
+        self._ema = np.where(np.isnan(self._ema), x, self._alpha[:, None] * x + (1 - self._alpha[:, None]) * self._ema)
+
+        n_diffs = np.minimum(t, self.windows)[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self._sum / n_diffs
+            vol = np.sqrt(np.maximum(self._sumsq / n_diffs - mean * mean, 0.0))
+        vol = np.where(n_diffs > 1, vol, np.nan)
+        self._vols[t % (self._depth + 1)] = vol
+
+        lag = np.minimum(self.windows, t)
+        past_values = self._values[(t - lag) % (self._depth + 1)]
+        past_vols = self._vols[(t - lag) % (self._depth + 1), np.arange(len(self.windows))]
+        f = self._features
+        f[0] = x - past_values
+        f[1] = self._ema - prev_ema if t else 0.0
+        f[2] = vol
+        f[3] = vol - past_vols
+        self._last = x
+        return self.features
+
+    def _resync(self) -> None:
+        # Running sums drift after many add/subtract steps; rebuild them exactly
+        t = self.count - 1
+        for i, w in enumerate(self.windows):
+            recent = self._diffs[[(t - j) % self._depth for j in range(min(t, w))]]
+            self._sum[i] = recent.sum(axis=0)
+            self._sumsq[i] = (recent * recent).sum(axis=0)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Flatten features to ``{"<feature>_<window>[_<key>]": value}``; keyless names are aggregates."""
+        out: Dict[str, float] = {}
+        agg = self.aggregate
+        for fi, name in enumerate(FEATURES):
+            for wi, w in enumerate(self.windows):
+                out[f"{name}_{w}"] = float(agg[fi, wi])
+                for ki, key in enumerate(self.keys):
+                    out[f"{name}_{w}_{key}"] = float(self._features[fi, wi, ki])
+        return out
+
+
+def engine_from_store(rows: int = 500, store: Optional[TimeSeriesStore] = None,
+                      windows: Sequence[int] = MOMENTUM_WINDOWS) -> MomentumEngine:
+    """Build a MomentumEngine warmed with the last ``rows`` stored snapshots."""
+    store = get_store() if store is None else store
+    engine = MomentumEngine(indicator_columns(store), windows=windows)
+    for snapshot in store.records(rows, engine.keys):
+        engine.update(snapshot)
+    return engine
@@ -1,45 +1,121 @@
 # Policy scenario definitions for the doom-watch project.
-from typing import Dict, Tuple, List
+from typing import Dict, Iterable, List, Sequence, Tuple
 
-# Each scenario checks the incoming data and returns an extra risk amount
+import numpy as np
+
+# Each scenario adds ``impact`` when all of its (feature, comparator, threshold)
+# conditions hold; missing features count as 0
 SCENARIOS = [
     {
         "name": "high_interest_low_confidence",
         "impact": 0.05,
-        "check": lambda d: d.get("faiz_orani", 0) > 0.5 and d.get("guven_endeksi_degisimi", 0) < -0.01,
+        "conditions": [("faiz_orani", ">", 0.5), ("guven_endeksi_degisimi", "<", -0.01)],
     },
     {
         "name": "political_uncertainty",
         "impact": 0.03,
-        "check": lambda d: d.get("politik_belirsizlik_skoru", 0) > 0.8,
+        "conditions": [("politik_belirsizlik_skoru", ">", 0.8)],
     },
     {
         "name": "inflation_unemployment",
         "impact": 0.07,
-        "check": lambda d: d.get("enflasyon_farki", 0) > 0.15 and d.get("issizlik_orani", 0) > 0.11,
+        "conditions": [("enflasyon_farki", ">", 0.15), ("issizlik_orani", ">", 0.11)],
     },
     {
         "name": "currency_volatility",
         "impact": 0.05,
-        "check": lambda d: d.get("doviz_kur_volatilite", 0) > 0.04,
+        "conditions": [("doviz_kur_volatilite", ">", 0.015)],
     },
     {
         "name": "low_sentiment_and_politics",
         "impact": 0.04,
-        "check": lambda d: d.get("public_sentiment", 0) < -0.5 and d.get("politik_belirsizlik_skoru", 0) > 0.8,
+        "conditions": [("public_sentiment", "<", -0.5), ("politik_belirsizlik_skoru", ">", 0.8)],
     },
 ]
 
+_OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+}
+
+
+class RuleEngine:
+    """Scenario conditions compiled into arrays and evaluated for many rows at once."""
+
+    def __init__(self, scenarios: Iterable[Dict] = ()):
+        self.scenarios: List[Dict] = []
+        self.load(scenarios, replace=True)
+
+    def load(self, scenarios: Iterable[Dict], replace: bool = False) -> None:
+        """Add (or with ``replace`` swap in) scenario definitions and recompile."""
+        scenarios = list(scenarios)
+        for scen in scenarios:
+            if not scen.get("conditions"):
+                raise ValueError(f"scenario {scen.get('name')!r} has no conditions")
+            for _, op, _ in scen["conditions"]:
+                if op not in _OPS:
+                    raise ValueError(f"unknown comparator {op!r}")
+        self.scenarios = scenarios if replace else self.scenarios + scenarios
+        self._compile()
+
+    def _compile(self) -> None:
+        self.names = [s["name"] for s in self.scenarios]
+        self.impacts = np.array([s["impact"] for s in self.scenarios], dtype=float)
+        conds = [c for s in self.scenarios for c in s["conditions"]]
+        self.features = sorted({f for f, _, _ in conds})
+        self._cond_cols = np.array([self.features.index(f) for f, _, _ in conds], dtype=int)
+        self._thresholds = np.array([t for _, _, t in conds], dtype=float)
+        ops = [op for _, op, _ in conds]
+        self._op_masks = {op: np.array([o == op for o in ops]) for op in set(ops)}
+        counts = [len(s["conditions"]) for s in self.scenarios]
+        self._starts = np.cumsum([0] + counts[:-1]).astype(int)
+        self._counts = np.array(counts, dtype=int)
+
+    def evaluate(self, X: np.ndarray, columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(adjustments, triggered)`` for the rows of ``X``.
+
+        ``columns`` names the columns of ``X``; ``triggered`` is an
+        ``(n, len(names))`` boolean matrix in scenario order.
+        """
+        X = np.asarray(X, dtype=float)
+        n = len(X)
+        if not self.scenarios:
+            return np.zeros(n), np.zeros((n, 0), dtype=bool)
+        index = {c: i for i, c in enumerate(columns)}
+        feats = np.zeros((n, len(self.features)))
+        for j, f in enumerate(self.features):
+            if f in index:
+                feats[:, j] = X[:, index[f]]
+        values = feats[:, self._cond_cols]
+        hold = np.zeros(values.shape, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for op, mask in self._op_masks.items():
+                hold[:, mask] = _OPS[op](values[:, mask], self._thresholds[mask])
+        triggered = np.add.reduceat(hold, self._starts, axis=1, dtype=int) == self._counts
+
+        # Rule by rule so totals add up in the same order as the scalar loop
+        adjustments = np.zeros(n)
+        for r, impact in enumerate(self.impacts):
+            adjustments = adjustments + np.where(triggered[:, r], impact, 0.0)
+        return adjustments, triggered
+
+    def evaluate_one(self, data: Dict[str, float]) -> Tuple[float, List[str]]:
+        row = []
+        for f in self.features:
+            try:
+                row.append(float(data.get(f, 0)))
+            except (TypeError, ValueError):
+                row.append(np.nan)
+        adjustments, triggered = self.evaluate(np.array([row]), self.features)
+        return float(adjustments[0]), [name for name, hit in zip(self.names, triggered[0]) if hit]
+
+
+ENGINE = RuleEngine(SCENARIOS)
+
 
 def scenario_adjustment(data: Dict[str, float]) -> Tuple[float, List[str]]:
     """Return extra risk and triggered scenario names."""
-    total_adjustment = 0.0
-    triggered: List[str] = []
-    for scen in SCENARIOS:
-        try:
-            if scen["check"](data):
-                total_adjustment += scen["impact"]
-                triggered.append(scen["name"])
-        except Exception:
-            continue
-    return total_adjustment, triggered
+    return ENGINE.evaluate_one(data)
@@ -0,0 +1,335 @@
+"""Shared access layer for the external HTTP APIs.
+
+``HttpProvider`` keeps one pooled keep-alive session, throttles each host
+with a token bucket, retries transient failures with jittered exponential
+backoff and coalesces identical in-flight GETs, so two sources asking for the
+same URL in one refresh share a single download. ``FakeProvider`` serves
+canned responses for tests and offline runs; swap it in with ``set_provider``.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+import json as jsonlib
+import logging
+import os
+import random
+import threading
+import time
+
+DEFAULT_TIMEOUT = 10.0
+POOL_SIZE = 16
+RETRIES = 2
+BACKOFF = 0.5  # seconds, doubled per attempt before jitter
+MAX_BACKOFF = 8.0
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# host -> (requests per second, burst)
+RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "api.tradingeconomics.com": (1.0, 3),
+    "api.telegram.org": (1.0, 5),
+    "api.openai.com": (0.5, 2),
+    "www.tcmb.gov.tr": (4.0, 8),
+}
+DEFAULT_RATE_LIMIT = (5.0, 10)
+
+
+class HTTPError(Exception):
+    """Raised for non-success responses; ``status`` holds the HTTP status code."""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+        self.retry_after: Optional[float] = None
+
+
+class Response:
+    """Fully read, immutable response that coalesced callers can share."""
+
+    def __init__(self, url: str, status_code: int = 200, content: bytes = b"",
+                 headers: Optional[Mapping[str, str]] = None, encoding: str = "utf-8"):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return jsonlib.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise HTTPError(self.status_code, self.url)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, sleeping until one is available or ``timeout`` passes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF, cap: float = MAX_BACKOFF) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+# Transient network errors from requests/urllib3/openai, matched by name so
+# the optional clients need not be imported; requests' ReadTimeout and
+# ConnectTimeout subclass these
+_RETRY_ERRORS = ("ConnectionError", "Timeout", "APIConnectionError", "APITimeoutError")
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, HTTPError):
+        return exc.status in RETRY_STATUS
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None)  # openai's APIStatusError and friends
+    if isinstance(status, int):
+        return status in RETRY_STATUS
+    # Anything else (bad JSON, auth, TLS, a local OSError) is not retried
+    return any(cls.__name__ in _RETRY_ERRORS for cls in type(exc).__mro__)
+
+
+class Provider:
+    """Base provider: rate limiting and retries around a ``_fetch`` primitive."""
+
+    def __init__(self, retries: int = RETRIES, rate_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.retries = retries
+        self.rate_limits = dict(RATE_LIMITS if rate_limits is None else rate_limits)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._inflight: Dict[tuple, Future] = {}
+
+    def limiter(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(*self.rate_limits.get(host, DEFAULT_RATE_LIMIT))
+            return bucket
+
+    def call(self, host: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` under ``host``'s rate limit, retrying transient failures.
+
+        Use this for API clients that do their own HTTP, such as OpenAI.
+        """
+        return self._with_retries(host, self.retries, fn, *args, **kwargs)
+
+    def _with_retries(self, host: str, retries: int, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        limiter = self.limiter(host)
+        for attempt in range(retries + 1):
+            limiter.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as exc:
+                if attempt >= retries or not _retryable(exc):
+                    raise
+                delay = backoff_delay(attempt)
+                retry_after = getattr(exc, "retry_after", None)
+                if retry_after:
+                    delay = max(delay, float(retry_after))
+                logging.warning("%s call failed (%s), retry %d in %.1fs", host, exc, attempt + 1, delay)
+                time.sleep(delay)
+
+    def get(self, url: str, params: Optional[Mapping[str, Any]] = None,
+            headers: Optional[Mapping[str, str]] = None, timeout: float = DEFAULT_TIMEOUT,
+            retries: Optional[int] = None) -> Response:
+        """GET ``url``; identical concurrent requests share one download.
+
+        Non-success statuses are returned, not raised, except for retryable
+        ones that are still failing after the last retry. ``retries``
+        overrides the provider's default, e.g. 0 for callers that retry
+        themselves. Callers joining an in-flight request raise TimeoutError
+        if it outlasts its worst case of ``retries + 1`` timed-out attempts.
+        """
+        key = (url, tuple(sorted((params or {}).items())), tuple(sorted((headers or {}).items())))
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        retries = self.retries if retries is None else retries
+        if not owner:
+            # Bound the wait by the owner's worst case: every attempt timing out plus backoff
+            return future.result(timeout=(retries + 1) * (timeout + MAX_BACKOFF))
+        try:
+            host = urlsplit(url).hostname or ""
+            future.set_result(self._with_retries(host, retries, self._checked_fetch, url, params, headers, timeout))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+    def _checked_fetch(self, url, params, headers, timeout) -> Response:
+        response = self._fetch(url, params, headers, timeout)
+        if response.status_code in RETRY_STATUS:
+            error = HTTPError(response.status_code, url)
+            error.retry_after = _retry_after(response)
+            raise error
+        return response
+
+    def _fetch(self, url: str, params: Optional[Mapping[str, Any]], headers: Optional[Mapping[str, str]],
+               timeout: float) -> Response:
+        raise NotImplementedError
+
+    def get_json(self, url: str, params: Optional[Mapping[str, Any]] = None,
+                 timeout: float = DEFAULT_TIMEOUT) -> Any:
+        response = self.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def get_text(self, url: str, params: Optional[Mapping[str, Any]] = None,
+                 timeout: float = DEFAULT_TIMEOUT) -> str:
+        response = self.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+
+def _retry_after(response: Response) -> Optional[float]:
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+class HttpProvider(Provider):
+    """Provider backed by one pooled ``requests.Session`` per process."""
+
+    def __init__(self, pool_size: int = POOL_SIZE, **kwargs):
+        super().__init__(**kwargs)
+        self.pool_size = pool_size
+        self._session = None
+        self._session_pid = 0
+
+    @property
+    def session(self):
+        """Return the keep-alive session, rebuilding it in forked child processes."""
+        if self._session is None or self._session_pid != os.getpid():
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+    def _fetch(self, url, params, headers, timeout) -> Response:
+        r = self.session.get(url, params=params, headers=headers, timeout=timeout)
+        return Response(r.url, r.status_code, r.content, r.headers, r.encoding or "utf-8")
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+class FakeProvider(Provider):
+    """Serves canned responses without touching the network.
+
+    ``routes`` maps a URL (query string ignored) or host to a body: ``bytes``
+    or ``str`` is returned as is, other values are JSON-encoded, a
+    ``Response`` is returned unchanged, an exception is raised and a callable
+    is called with ``(url, params)``. ``call`` returns the route for the host
+    when there is one and otherwise runs the function. Requests are recorded
+    in ``calls``. Rate limits are off by default.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, Any]] = None, retries: int = 0,
+                 rate_limits: Optional[Dict[str, Tuple[float, int]]] = None, latency: float = 0.0):
+        super().__init__(retries=retries, rate_limits=rate_limits or {})
+        self.routes = dict(routes or {})
+        self.latency = latency
+        self.calls: List[Tuple[str, Optional[Mapping[str, Any]]]] = []
+        if rate_limits is None:
+            self.limiter = lambda host: _UNLIMITED
+
+    def _route(self, url: str) -> Any:
+        base = url.split("?", 1)[0]
+        for key in (url, base, urlsplit(url).hostname):
+            if key in self.routes:
+                return self.routes[key]
+        raise HTTPError(404, url)
+
+    def _fetch(self, url, params, headers, timeout) -> Response:
+        self.calls.append((url, params))
+        if self.latency:
+            time.sleep(self.latency)
+        body = self._route(url)
+        if callable(body) and not isinstance(body, Response):
+            body = body(url, params)
+        if isinstance(body, BaseException):
+            raise body
+        if isinstance(body, Response):
+            return body
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        elif not isinstance(body, bytes):
+            body = jsonlib.dumps(body).encode("utf-8")
+        return Response(url, 200, body)
+
+    def call(self, host: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if host in self.routes:
+            self.calls.append((host, None))
+            body = self.routes[host]
+            if isinstance(body, BaseException):
+                raise body
+            return body(*args, **kwargs) if callable(body) else body
+        return super().call(host, fn, *args, **kwargs)
+
+
+class _Unlimited:
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+
+_UNLIMITED = _Unlimited()
+
+_PROVIDER: Optional[Provider] = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+def get_provider() -> Provider:
+    """Return the process-wide provider, creating an HttpProvider on first use."""
+    global _PROVIDER
+    with _PROVIDER_LOCK:
+        if _PROVIDER is None:
+            _PROVIDER = HttpProvider()
+        return _PROVIDER
+
+
+def set_provider(provider: Optional[Provider]) -> Optional[Provider]:
+    """Install ``provider`` (None resets to the default) and return the previous one."""
+    global _PROVIDER
+    with _PROVIDER_LOCK:
+        previous, _PROVIDER = _PROVIDER, provider
+        return previous
@@ -0,0 +1,132 @@
+"""Fixed-size rolling windows with O(1) summary statistics."""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Mapping
+
+import numpy as np
+
+
+class RollingWindow:
+    """Array-backed ring buffer keeping Welford mean/variance and min/max.
+
+    Mean and variance are updated incrementally as values enter and leave the
+    window; min and max come from monotonic deques, so every statistic is O(1)
+    amortised per appended value.
+    """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("window size must be positive")
+        self.size = size
+        self._buf = np.empty(size, dtype=float)
+        self._seq = 0  # number of values ever appended
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min: deque = deque()  # (seq, value), values increasing
+        self._max: deque = deque()  # (seq, value), values decreasing
+
+    def __len__(self) -> int:
+        return min(self._seq, self.size)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.values().tolist())
+
+    def append(self, value: float) -> None:
+        x = float(value)
+        seq = self._seq
+        pos = seq % self.size
+        if seq < self.size:
+            n = seq + 1
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+        else:
+            old = self._buf[pos]
+            old_mean = self._mean
+            self._mean += (x - old) / self.size
+            self._m2 = max(0.0, self._m2 + (x - old) * (x - self._mean + old - old_mean))
+        self._buf[pos] = x
+        self._seq = seq + 1
+
+        expired = seq - self.size
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._min.append((seq, x))
+        while self._min[0][0] <= expired:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._max.append((seq, x))
+        while self._max[0][0] <= expired:
+            self._max.popleft()
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.append(value)
+
+    def values(self) -> np.ndarray:
+        """Return the window contents oldest first."""
+        if self._seq <= self.size:
+            return self._buf[: self._seq].copy()
+        pos = self._seq % self.size
+        return np.concatenate((self._buf[pos:], self._buf[:pos]))
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation of the window."""
+        n = len(self)
+        return (self._m2 / n) ** 0.5 if n else 0.0
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1]
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1]
+
+    def stats(self) -> Dict[str, float]:
+        return {"min": self.min, "max": self.max, "mean": self.mean, "std": self.std}
+
+
+class RollingHistory:
+    """One RollingWindow per indicator with vectorised access to their stats."""
+
+    def __init__(self, keys: Iterable[str], window: int):
+        self.keys: List[str] = list(keys)
+        self.window = window
+        self._windows = {k: RollingWindow(window) for k in self.keys}
+
+    def __getitem__(self, key: str) -> RollingWindow:
+        return self._windows[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._windows
+
+    def append(self, data: Mapping[str, float]) -> None:
+        """Append every indicator present in ``data``."""
+        for key, win in self._windows.items():
+            if key in data:
+                win.append(data[key])
+
+    def stats_matrix(self, defaults: Mapping[str, Mapping[str, float]]) -> np.ndarray:
+        """Return a ``(4, n_keys)`` array of min/max/mean/std rows.
+
+        Indicators with an empty window use the values from ``defaults``.
+        """
+        out = np.empty((4, len(self.keys)), dtype=float)
+        for j, key in enumerate(self.keys):
+            win = self._windows[key]
+            params = win.stats() if len(win) else defaults[key]
+            out[:, j] = (params["min"], params["max"], params["mean"], params["std"])
+        return out
+
+    def clear(self) -> None:
+        self._windows = {k: RollingWindow(self.window) for k in self.keys}
@@ -1,5 +1,5 @@
 # Rule mining for economic risk scenarios.
-from typing import List
+from typing import Dict, List
 
 import pandas as pd
 from sklearn.tree import DecisionTreeClassifier, export_text
@@ -14,3 +14,48 @@ def learn_scenarios(X: pd.DataFrame, y: List[int]) -> List[str]:
     clf.fit(X, y)
     rules = export_text(clf, feature_names=list(X.columns))
     return rules.splitlines()
+
+
+def extract_rules(clf, feature_names: List[str], impact: float = 0.05,
+                  min_confidence: float = 0.5, prefix: str = "learned") -> List[Dict]:
+    """Turn the risk leaves of a fitted tree into scenario definitions.
+
+    Every leaf whose share of the highest class is at least ``min_confidence``
+    becomes one scenario whose conditions are the splits on its path; the
+    impact is scaled by that share. The result can be loaded into
+    ``politika_scenarios.ENGINE``.
+    """
+    tree = clf.tree_
+    positive = list(clf.classes_).index(max(clf.classes_))
+    scenarios: List[Dict] = []
+
+    def walk(node: int, path: List) -> None:
+        left, right = tree.children_left[node], tree.children_right[node]
+        if left == right:  # leaf
+            counts = tree.value[node][0]
+            confidence = float(counts[positive] / counts.sum()) if counts.sum() else 0.0
+            if path and confidence >= min_confidence:
+                scenarios.append({
+                    "name": f"{prefix}_{len(scenarios) + 1}",
+                    "impact": round(impact * confidence, 4),
+                    "conditions": list(path),
+                })
+            return
+        feature = feature_names[tree.feature[node]]
+        threshold = float(tree.threshold[node])
+        walk(left, path + [(feature, "<=", threshold)])
+        walk(right, path + [(feature, ">", threshold)])
+
+    walk(0, [])
+    return scenarios
+
+
+def learn_scenario_rules(X: pd.DataFrame, y: List[int], impact: float = 0.05,
+                         min_confidence: float = 0.5) -> List[Dict]:
+    """Learn decision rules and return them as scenario definitions."""
+    if X.empty or not len(y):
+        return []
+
+    clf = DecisionTreeClassifier(max_depth=3, random_state=42)
+    clf.fit(X, y)
+    return extract_rules(clf, list(X.columns), impact=impact, min_confidence=min_confidence)
@@ -1,12 +1,16 @@
 # Sentiment analysis using a Turkish BERT model.
 """Sentiment analysis utilities."""
 
-from typing import List
+from itertools import zip_longest
+from typing import Dict, List, Tuple, Union
 import logging
 import random
 import numpy as np
-from transformers import pipeline
-import feedparser
+
+from dedup import filter_texts
+from feeds import fetch_feeds
+from metrics import inc, timed
+from sentiment_model import score_texts
 
 # Additional Turkish RSS feed URLs
 RSS_FEEDS = [
@@ -24,34 +28,21 @@ RSS_FEEDS = [
 ]
 
 
-def fetch_rss_texts(keywords: List[str] = None, limit: int = 50) -> List[str]:
-    """Return news texts from all feeds with optional keyword filtering."""
-    texts: List[str] = []
-    for url in RSS_FEEDS:
-        try:
-            feed = feedparser.parse(url)
-            if feed.bozo:
-                logging.warning("RSS error %s: %s", url, feed.bozo_exception)
-                continue
-            for entry in feed.entries:
-                text = ""
-                if hasattr(entry, "title"):
-                    text += entry.title
-                if hasattr(entry, "summary"):
-                    text += " " + entry.summary
-                elif hasattr(entry, "description"):
-                    text += " " + entry.description
-                if not text.strip() or text.strip() in texts:
-                    continue
-                if keywords and not any(kw.lower() in text.lower() for kw in keywords):
-                    continue
-                texts.append(text.strip())
-                if len(texts) >= limit:
-                    break
-            if len(texts) >= limit:
-                break
-        except Exception as exc:
-            logging.warning("feed parse failed for %s: %s", url, exc)
+@timed("fetch_rss_texts")
+def fetch_rss_texts(keywords: List[str] = None, limit: int = 50,
+                    with_stats: bool = False) -> Union[List[str], Tuple[List[str], Dict[str, int]]]:
+    """Return current news texts from all feeds with optional keyword filtering.
+
+    Feeds are fetched in parallel with conditional requests. Texts are taken
+    newest first, one feed at a time in turn, so ``limit`` keeps the latest
+    stories from every feed. Exact and near-duplicate stories (the same wire
+    text on several outlets) are dropped. With ``with_stats`` a dict of drop
+    counts is returned too.
+    """
+    feeds = fetch_feeds(RSS_FEEDS)
+    by_feed = list(feeds.values())
+    candidates = (t for row in zip_longest(*by_feed) for t in row if t is not None)
+    texts, stats = filter_texts(candidates, keywords=keywords or (), limit=limit)
     if not texts:
         logging.warning("No RSS texts fetched; using fallback samples")
         samples = [
@@ -60,34 +51,32 @@ def fetch_rss_texts(keywords: List[str] = None, limit: int = 50) -> List[str]:
             "Dolar kuru sakin seyrini sürdürüyor.",
             "Enflasyon rakamları merakla bekleniyor.",
         ]
-        return random.sample(samples, k=min(len(samples), 3))
-    return texts[:limit]
+        texts = random.sample(samples, k=min(len(samples), 3))
+        stats["fallback"] = len(texts)
+        inc("fallback_total", source="rss")
+    return (texts, stats) if with_stats else texts
 
 
+@timed("get_sentiment_score")
 def get_sentiment_score(texts: List[str]) -> float:
     """Return mean sentiment score for the provided texts."""
     if not texts:
         return 0.0
     try:
-        nlp = pipeline(
-            "sentiment-analysis",
-            model="savasy/bert-base-turkish-sentiment-cased",
-            tokenizer="savasy/bert-base-turkish-sentiment-cased",
-        )
-        results = nlp(texts)
-        scores = [r["score"] * (1 if "POS" in r["label"] else -1) for r in results]
-        return float(np.clip(np.mean(scores), -1.0, 1.0))
+        scores = score_texts(texts)
+        return float(np.clip(scores.mean(), -1.0, 1.0))
     except Exception as exc:
         logging.error("Sentiment analysis failed: %s", exc)
         return 0.0
 
 
 def get_public_sentiment(keywords: List[str] = None) -> float:
-    """Fetch texts from RSS feeds for keywords and compute sentiment score."""
-    texts = fetch_rss_texts(keywords=keywords)
-    if not texts:
-        return 0.0
-    return get_sentiment_score(texts)
+    """Fetch texts from RSS feeds for keywords and compute sentiment score.
+
+    Stories already scored are served from the sentiment cache, so only
+    texts new to the feeds reach the model.
+    """
+    return get_sentiment_score(fetch_rss_texts(keywords=keywords))
 
 
 if __name__ == "__main__":
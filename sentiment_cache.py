@@ -0,0 +1,124 @@
+"""Persistent SQLite cache of sentiment scores keyed by text and model."""
+
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from config import DATA_DIR
+
+CACHE_MAX_ENTRIES = 200_000
+CACHE_TTL = 30 * 86400  # seconds
+_CHUNK = 500  # stay below SQLite's bound-parameter limit
+
+
+def normalize_text(text: str) -> str:
+    """Return the form of ``text`` used for cache keys (NFC, single spaces)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text: str, model: str) -> str:
+    return hashlib.sha1(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """Content-hash keyed score cache with TTL and LRU eviction."""
+
+    def __init__(self, path: str, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key TEXT PRIMARY KEY, score REAL NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scores_accessed ON scores (accessed)")
+        self._conn.commit()
+
+    def get_many(self, texts: List[str], model: str) -> Dict[int, float]:
+        """Return ``{index: score}`` for the texts found in the cache."""
+        keys = [cache_key(t, model) for t in texts]
+        cutoff = time.time() - self.ttl
+        found: Dict[str, float] = {}
+        with self._lock:
+            for i in range(0, len(keys), _CHUNK):
+                chunk = keys[i:i + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, score FROM scores WHERE created >= ? AND key IN ({marks})",
+                    [cutoff, *chunk],
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE scores SET accessed = ? WHERE key = ?", [(now, k) for k in found])
+                self._conn.commit()
+            hits = {i: found[k] for i, k in enumerate(keys) if k in found}
+            self.hits += len(hits)
+            self.misses += len(keys) - len(hits)
+        return hits
+
+    def put_many(self, texts: List[str], scores: List[float], model: str) -> None:
+        """Store scores for texts and evict expired or least recently used rows."""
+        now = time.time()
+        rows = [(cache_key(t, model), float(s), now, now) for t, s in zip(texts, scores)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)", rows)
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM scores WHERE created < ?", (now - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY accessed LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the number of stored entries."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": entries,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM scores")
+            self._conn.commit()
+            self.hits = self.misses = 0
+
+
+_CACHE: Optional[SentimentCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> Optional[SentimentCache]:
+    """Return the process-wide cache under ``DATA_DIR``, or None if unavailable."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                try:
+                    _CACHE = SentimentCache(os.path.join(DATA_DIR, "sentiment_cache.sqlite"))
+                except Exception as exc:
+                    logging.warning("sentiment cache unavailable: %s", exc)
+                    return None
+    return _CACHE
@@ -0,0 +1,143 @@
+"""Shared, lazily loaded Turkish BERT sentiment model."""
+
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+import numpy as np
+
+from metrics import cache_lookup, inc, observe, set_gauge
+from sentiment_cache import get_cache, normalize_text
+
+SENTIMENT_MODEL = "savasy/bert-base-turkish-sentiment-cased"
+BATCH_SIZE = 32
+MAX_LENGTH = 128  # tokens; headlines and summaries rarely exceed this
+
+_PIPELINES: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+# Fast tokenizers are not thread-safe ("Already borrowed"): one caller per pipeline
+_INFER_LOCKS: Dict[str, threading.Lock] = {}
+_DEFAULT_MODEL = SENTIMENT_MODEL
+
+
+def use_model(model: str) -> None:
+    """Make ``model`` the default of get_pipeline, warm_up and score_texts.
+
+    Cached scores are keyed by model id, so a stand-in registered under its
+    own id never mixes its scores with the real model's.
+    """
+    global _DEFAULT_MODEL
+    _DEFAULT_MODEL = model
+
+
+def get_pipeline(model: Optional[str] = None) -> Callable:
+    """Return the sentiment pipeline for ``model``, loading it on first use.
+
+    The pipeline is created once per process and shared by all callers and
+    threads; concurrent first calls wait for a single load.
+    """
+    model = model or _DEFAULT_MODEL
+    nlp = _PIPELINES.get(model)
+    if nlp is not None:
+        return nlp
+    with _LOCK:
+        nlp = _PIPELINES.get(model)
+        if nlp is None:
+            from transformers import pipeline
+
+            logging.info("loading sentiment model %s", model)
+            nlp = pipeline("sentiment-analysis", model=model, tokenizer=model)
+            _PIPELINES[model] = nlp
+    return nlp
+
+
+def set_pipeline(nlp: Callable, model: str = SENTIMENT_MODEL) -> None:
+    """Register an already built pipeline, e.g. a lightweight stand-in.
+
+    Register stand-ins under their own id and select it with use_model.
+    """
+    with _LOCK:
+        _PIPELINES[model] = nlp
+
+
+def _infer_lock(model: str) -> threading.Lock:
+    with _LOCK:
+        return _INFER_LOCKS.setdefault(model, threading.Lock())
+
+
+def warm_up(model: Optional[str] = None, background: bool = False) -> None:
+    """Load the model ahead of the first request, optionally in a thread."""
+
+    def _load() -> None:
+        try:
+            name = model or _DEFAULT_MODEL
+            nlp = get_pipeline(name)
+            with _infer_lock(name):
+                nlp(["ısınma"])
+        except Exception as exc:
+            logging.warning("sentiment warm-up failed: %s", exc)
+
+    if background:
+        threading.Thread(target=_load, name="sentiment-warm-up", daemon=True).start()
+    else:
+        _load()
+
+
+def _signed(result: Dict[str, Any]) -> float:
+    score = float(result.get("score", 0.0))
+    return score if "POS" in str(result.get("label", "")).upper() else -score
+
+
+def _infer(texts: List[str], batch_size: int, max_length: int, model: str) -> np.ndarray:
+    scores = np.zeros(len(texts), dtype=float)
+    nlp = get_pipeline(model)
+    infer_lock = _infer_lock(model)
+    began = time.perf_counter()
+    # Pre-trim very long inputs so the tokenizer does not chew through them
+    clipped = [t[: max_length * 8] for t in texts]
+    order = np.argsort([len(t) for t in clipped], kind="stable")
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        batch = [clipped[i] for i in idx]
+        with infer_lock:
+            results = nlp(batch, batch_size=len(batch), truncation=True, max_length=max_length)
+        scores[idx] = [_signed(r) for r in results]
+    elapsed = time.perf_counter() - began
+    observe("inference_seconds", elapsed, model=model)
+    inc("inference_texts_total", len(texts), model=model)
+    if elapsed > 0:
+        set_gauge("inference_texts_per_second", len(texts) / elapsed, model=model)
+    return scores
+
+
+def score_texts(texts: List[str], batch_size: int = BATCH_SIZE, max_length: int = MAX_LENGTH,
+                model: Optional[str] = None, use_cache: bool = True) -> np.ndarray:
+    """Return signed sentiment scores in [-1, 1] for each text, in input order.
+
+    Texts are sorted by length and run in fixed-size batches so each batch
+    pads to similar lengths; inputs are truncated to ``max_length`` tokens.
+    With ``use_cache`` only texts missing from the sentiment cache are run
+    through the model.
+    """
+    scores = np.zeros(len(texts), dtype=float)
+    if not texts:
+        return scores
+    model = model or _DEFAULT_MODEL
+    cache = get_cache() if use_cache else None
+    cached = cache.get_many(texts, model) if cache else {}
+    if cached:
+        hit_idx = np.fromiter(cached.keys(), dtype=int, count=len(cached))
+        scores[hit_idx] = np.fromiter(cached.values(), dtype=float, count=len(cached))
+    missing = [i for i in range(len(texts)) if i not in cached]
+    if cache:
+        cache_lookup("sentiment", len(cached), len(missing))
+    if missing:
+        normalized = {i: normalize_text(texts[i]) for i in missing}
+        unique = list(dict.fromkeys(normalized.values()))
+        inferred = _infer(unique, batch_size, max_length, model)
+        lookup = dict(zip(unique, inferred))
+        scores[missing] = [lookup[normalized[i]] for i in missing]
+        if cache:
+            cache.put_many(unique, inferred.tolist(), model)
+    return scores
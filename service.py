@@ -0,0 +1,249 @@
+"""Long-running scoring service with a local HTTP/JSON API.
+
+Keeps models and caches warm in one process and refreshes the score on a
+timer. Endpoints:
+
+    GET  /score    latest score, scenarios and indicator data as JSON
+    GET  /events   server-sent events, one ``data:`` line per refresh
+    GET  /healthz  liveness, age of the latest snapshot and alert queue metrics
+    GET  /metrics  stage latencies, fallbacks and cache hits as Prometheus text
+    GET  /metrics.json  the same metrics as JSON
+    POST /refresh  run a refresh now and return the new snapshot; with
+                   ``?max_age=N`` a snapshot at most N seconds old is reused,
+                   with ``?profile=1`` the cProfile report is included
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import logging
+import queue
+import threading
+import time
+
+import doom_watch as dw
+import fx
+import metrics
+from config import SERVICE_HOST, SERVICE_PORT
+from sentiment_model import warm_up
+
+REFRESH_INTERVAL = 300  # seconds
+KEEPALIVE = 15  # seconds between SSE comments on an idle stream
+REFRESH_WAIT = 30  # seconds get() waits for an in-progress first refresh
+
+
+class ScoreRefresher:
+    """Runs the scoring pipeline on a timer and publishes each snapshot."""
+
+    def __init__(self, interval: float = REFRESH_INTERVAL):
+        self.interval = interval
+        self.latest: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()
+        self._subscribers: List[queue.Queue] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    def refresh(self) -> Dict[str, Any]:
+        """Fetch data, score it, store it and notify subscribers."""
+        with self._refresh_lock:
+            data = dw.get_live_data()
+            score, scenarios = dw.calculate_risk_score(data)
+            dw.record_snapshot(data, score, scenarios)
+            snapshot = {"score": score, "scenarios": scenarios, "data": data, "timestamp": time.time()}
+            with self._lock:
+                self.latest = snapshot
+                subscribers = list(self._subscribers)
+            self._ready.set()
+            for q in subscribers:
+                self._publish(q, snapshot)
+            return snapshot
+
+    @staticmethod
+    def _publish(q: queue.Queue, snapshot: Dict[str, Any]) -> None:
+        """Queue ``snapshot`` without blocking; a full queue drops its oldest item."""
+        while True:
+            try:
+                q.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def refresh_if_older(self, max_age: float) -> Dict[str, Any]:
+        """Refresh unless the latest snapshot is at most ``max_age`` seconds old.
+
+        Concurrent callers wait for one refresh instead of each running one.
+        """
+        with self._refresh_lock:
+            age = self.age()
+            if age is not None and age <= max_age:
+                return self.latest
+            return self.refresh()
+
+    def get(self, wait: float = REFRESH_WAIT) -> Dict[str, Any]:
+        """Return the latest snapshot, refreshing once if there is none yet.
+
+        While the background loop is running its first refresh, wait up to
+        ``wait`` seconds for it instead of starting a second one.
+        """
+        if self.latest is None and self._thread is not None and self._thread.is_alive():
+            self._ready.wait(wait)
+        return self.latest or self.refresh()
+
+    def age(self) -> Optional[float]:
+        latest = self.latest
+        return None if latest is None else time.time() - latest["timestamp"]
+
+    def subscribe(self) -> queue.Queue:
+        q: queue.Queue = queue.Queue(maxsize=16)
+        with self._lock:
+            self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def _loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as exc:
+                    logging.warning("scheduled refresh failed: %s", exc)
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(target=_loop, name="score-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    refresher: ScoreRefresher
+
+    def log_message(self, fmt: str, *args) -> None:
+        logging.debug("%s - %s", self.address_string(), fmt % args)
+
+    def _send_json(self, payload: Any, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, text: str, content_type: str = "text/plain; version=0.0.4") -> None:
+        body = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if path == "/score":
+            self._send_json(self.refresher.get())
+        elif path == "/healthz":
+            from alerts import DISPATCHER
+
+            self._send_json({"status": "ok", "age": self.refresher.age(), "alerts": DISPATCHER.metrics()})
+        elif path == "/metrics":
+            self._send_text(metrics.prometheus_text())
+        elif path == "/metrics.json":
+            self._send_json(metrics.snapshot())
+        elif path == "/events":
+            self._stream()
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self) -> None:
+        path, _, query = self.path.partition("?")
+        if path == "/refresh" and "profile=1" in query.split("&"):
+            snapshot, report = metrics.profile_call(self.refresher.refresh)
+            self._send_json(dict(snapshot, profile=report))
+        elif path == "/refresh":
+            params = dict(p.partition("=")[::2] for p in query.split("&") if p)
+            if "max_age" in params:
+                try:
+                    max_age = float(params["max_age"])
+                except ValueError:
+                    self._send_json({"error": "max_age must be a number"}, status=400)
+                    return
+                self._send_json(self.refresher.refresh_if_older(max_age))
+            else:
+                self._send_json(self.refresher.refresh())
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def _stream(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        q = self.refresher.subscribe()
+        try:
+            if self.refresher.latest:
+                self.wfile.write(f"data: {json.dumps(self.refresher.latest)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            while True:
+                try:
+                    snapshot = q.get(timeout=KEEPALIVE)
+                    chunk = f"data: {json.dumps(snapshot)}\n\n"
+                except queue.Empty:
+                    chunk = ": keepalive\n\n"
+                self.wfile.write(chunk.encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.refresher.unsubscribe(q)
+
+
+def make_server(host: str = SERVICE_HOST, port: int = SERVICE_PORT,
+                refresher: Optional[ScoreRefresher] = None) -> ThreadingHTTPServer:
+    """Build an HTTP server bound to ``host:port`` serving ``refresher``."""
+    handler = type("Handler", (_Handler,), {"refresher": refresher or ScoreRefresher()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = SERVICE_HOST, port: int = SERVICE_PORT, interval: float = REFRESH_INTERVAL) -> None:
+    """Warm models, start the refresh loop and serve until interrupted."""
+    # Load the model before the first refresh so its budget is not spent on it
+    warm_up()
+    fx.warm_up(background=True)
+    refresher = ScoreRefresher(interval=interval)
+    refresher.start()
+    server = make_server(host, port, refresher)
+    logging.info("doom-watch service listening on http://%s:%d", host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        refresher.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Doom Watch scoring service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--interval", type=float, default=REFRESH_INTERVAL, help="refresh period in seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    serve(args.host, args.port, args.interval)
@@ -1,18 +1,38 @@
-"""Streamlit interface for the doom-watch application."""
+"""Streamlit interface for the doom-watch application.
 
-import datetime
+The app does not run the pipeline itself: it reads snapshots from the
+running scoring service (``service.py``) and, when the service is down, the
+latest row of the snapshot store. Manual inputs are applied as a local
+what-if on top of that snapshot.
+"""
+
+from typing import Any, Dict, Optional
+import json
+import math
 import random
+import time
+import urllib.request
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 import doom_watch as dw
+from config import SERVICE_HOST, SERVICE_PORT
 from sentiment import get_sentiment_score
+from market_watch import check_bist_crash
+from service import REFRESH_INTERVAL
+from tsstore import SCENARIO_PREFIX, SCORE_COLUMN, get_store
+
+SERVICE_URL = f"http://{SERVICE_HOST}:{SERVICE_PORT}"
+SERVICE_TIMEOUT = 2.0  # seconds for reading a snapshot
+REFRESH_TIMEOUT = 60.0  # seconds the update button waits for the service
+MIN_MANUAL_REFRESH = 60  # seconds; the update button reuses younger snapshots
+VIEW_REFRESH = 30  # seconds between automatic re-renders of the score view
 
 # Simple localization dictionary
 TXT = {
     "tr": {
         "title": "Türkiye Ekonomisi Kıyamet Saati \U0001F570\ufe0f",
-        "date": "\U0001F4C5 Tarih Seç",
         "manual": "Manuel Veri Girişi",
         "auto_demand": "Otomotiv Talep Değişimi (Örn: -0.05 için -%5)",
         "news_box": "Bugün duyduğun herhangi bir negatif gelişmeyi buraya gir (isteğe bağlı)",
@@ -24,10 +44,13 @@ TXT = {
         "update_hint": "Verileri güncellemek ve risk skorunu görmek için yukarıdaki butona tıklayın.",
         "trigger": "Tetiklenen Senaryolar",
         "graph": "Risk Göstergesi Grafiği",
+        "age": "Son güncelleme {age:.0f} sn önce",
+        "no_service": "Skor servisi çalışmıyor; son kayıtlı skor gösteriliyor (python service.py).",
+        "no_data": "Henüz skor yok. Skor servisini başlatın: python service.py",
+        "refresh_failed": "Skor servisine ulaşılamadı; güncelleme yapılamadı (python service.py).",
     },
     "en": {
         "title": "Turkey Economy Doomsday Clock \U0001F570\ufe0f",
-        "date": "\U0001F4C5 Select Date",
         "manual": "Manual Data Entry",
         "auto_demand": "Automotive Demand Change (e.g. -0.05 for -5%)",
         "news_box": "Enter any negative news you heard today (optional)",
@@ -39,22 +62,78 @@ TXT = {
         "update_hint": "Click the button above to refresh data and see the score.",
         "trigger": "Triggered Scenarios",
         "graph": "Risk Indicator Graph",
+        "age": "Last updated {age:.0f}s ago",
+        "no_service": "The scoring service is not running; showing the last stored score (python service.py).",
+        "no_data": "No score yet. Start the scoring service: python service.py",
+        "refresh_failed": "Could not reach the scoring service; nothing was refreshed (python service.py).",
     },
 }
 
+
+def _service(path: str, method: str = "GET", timeout: float = SERVICE_TIMEOUT) -> Optional[Dict[str, Any]]:
+    """Call the scoring service and return its JSON, or None if it is not running."""
+    try:
+        request = urllib.request.Request(SERVICE_URL + path, method=method)
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            return json.load(resp)
+    except Exception:
+        return None
+
+
+def _stored_snapshot() -> Optional[Dict[str, Any]]:
+    """Latest snapshot recorded in the store by the service or CLI, or None."""
+    ts, cols = get_store().tail(1)
+    if not len(ts):
+        return None
+    row = {k: float(v[0]) for k, v in cols.items() if not math.isnan(v[0])}
+    return {
+        "score": row.get(SCORE_COLUMN, 0.0),
+        "scenarios": [k[len(SCENARIO_PREFIX):] for k, v in row.items() if k.startswith(SCENARIO_PREFIX) and v],
+        "data": {k: row[k] for k in dw.INDICATORS if k in row},
+        "timestamp": float(ts[0]),
+    }
+
+
+@st.cache_data(ttl=REFRESH_INTERVAL, show_spinner=False)
+def _bist_crash() -> bool:
+    return check_bist_crash()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _news_sentiment(text: str) -> float:
+    return get_sentiment_score([text])
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _warm_history(last_ts: Optional[float]) -> int:
+    """Load the service's recent snapshots into HISTORY, once per stored snapshot.
+
+    The what-if is normalised against the same rolling window the service
+    uses, so unchanged inputs score the same as on the service.
+    """
+    return dw.warm_history()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _history(last_ts: float) -> pd.DataFrame:
+    """Daily scores for the last 7 days; recomputed only when a snapshot is added."""
+    days, daily = get_store().downsample(
+        86400, start=last_ts - 7 * 86400, columns=[SCORE_COLUMN], how="last"
+    )
+    df = pd.DataFrame({"Tarih": pd.to_datetime(days, unit="s"), "Skor": np.round(daily[SCORE_COLUMN], 2)})
+    df["Tarih"] = df["Tarih"].dt.strftime("%Y-%m-%d")
+    return df.set_index("Tarih")
+
+
 lang = st.sidebar.selectbox("Language / Dil", ["tr", "en"], index=0)
 T = TXT[lang]
 
 st.title(T["title"])
 
-# session state for history and manual data
-if "history" not in st.session_state:
-    st.session_state.history = []
+# session state for manual data; score history lives in the snapshot store
 if "otomotiv_data" not in st.session_state:
     st.session_state.otomotiv_data = random.uniform(-0.15, 0.05)
 
-selected_date = st.date_input(T["date"], value=datetime.date.today())
-
 st.markdown("---")
 
 st.subheader(T["manual"])
@@ -73,15 +152,50 @@ user_news = st.text_area(T["news_box"], "")
 st.markdown("---")
 
 if st.button(T["update"]):
-    st.write("...")
-    data = dw.get_live_data()
+    # The service runs the pipeline; concurrent clicks share one refresh
+    if _service(f"/refresh?max_age={MIN_MANUAL_REFRESH}", method="POST", timeout=REFRESH_TIMEOUT) is None:
+        st.error(T["refresh_failed"])
+    st.session_state.show_score = True
+
+
+def _score_view() -> None:
+    if st.session_state.get("show_score"):
+        _render_score()
+    else:
+        st.info(T["update_hint"])
+
+    st.markdown("---")
+    last_ts = get_store().last_timestamp()
+    if last_ts is not None:
+        history = _history(last_ts)
+        if len(history):
+            st.subheader(T["history"])
+            st.line_chart(history)
+            st.table(history)
+
+
+def _render_score() -> None:
+    snapshot = _service("/score")
+    if snapshot is None:
+        snapshot = _stored_snapshot()
+        if snapshot is None:
+            st.info(T["no_data"])
+            return
+        st.caption(T["no_service"])
+    data = dict(snapshot["data"])
+    # Stored rows can predate an indicator; score those at its typical value
+    for key in dw.INDICATORS:
+        data.setdefault(key, dw.NORMALIZATION[key]["mean"])
     data["otomotiv_talep_degisimi"] = st.session_state.otomotiv_data
     if user_news.strip():
-        user_sent = get_sentiment_score([user_news])
+        user_sent = _news_sentiment(user_news.strip())
         data["public_sentiment"] = (data.get("public_sentiment", 0.0) + user_sent) / 2
 
+    # Scoring the what-if is cheap; only fetching and inference are shared
+    _warm_history(get_store().last_timestamp())
     score, scenarios = dw.calculate_risk_score(data)
     st.subheader(f"Güncel Risk Skoru: **{score:.2f}**")
+    st.caption(T["age"].format(age=time.time() - snapshot["timestamp"]))
 
     if score > 0.75:
         st.error(T["high"])
@@ -93,22 +207,17 @@ if st.button(T["update"]):
     if scenarios:
         st.info(f"**{T['trigger']}:** {', '.join(scenarios)}")
 
-    st.session_state.history.append({"Tarih": selected_date, "Skor": round(score, 2)})
-    st.session_state.history = st.session_state.history[-7:]
-
     st.subheader(T["graph"])
     fig = dw.plot_risk_indicator(score)
     st.plotly_chart(fig, use_container_width=True)
 
-    if dw.check_bist_crash():
+    if _bist_crash():
         st.warning("\U0001F6A8 BIST'te ani düşüş tespit edildi!")
-else:
-    st.info(T["update_hint"])
 
-st.markdown("---")
 
-if st.session_state.history:
-    st.subheader(T["history"])
-    df = pd.DataFrame(st.session_state.history)
-    df["Tarih"] = pd.to_datetime(df["Tarih"]).dt.strftime("%Y-%m-%d")
-    st.table(df.set_index("Tarih"))
+# Re-render the score view on a timer where st.fragment supports it; the
+# rest of the page (and its widgets) is not rerun
+if hasattr(st, "fragment"):
+    st.fragment(run_every=VIEW_REFRESH)(_score_view)()
+else:
+    _score_view()
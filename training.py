@@ -0,0 +1,154 @@
+"""Parallel, cached rule mining and weight fitting over labelled indicator history.
+
+Engineered feature matrices are memoised on disk with ``joblib.Memory``;
+cross-validated tree and forest fits run in parallel with ``joblib.Parallel``.
+The winning configuration yields scenario rules for ``politika_scenarios``
+and indicator weights for ``doom_watch.calculate_risk_score``.
+"""
+
+from typing import Dict, List, Sequence
+import itertools
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import balanced_accuracy_score
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.tree import DecisionTreeClassifier
+
+from config import DATA_DIR
+from rule_miner import extract_rules
+
+MEMORY = Memory(os.path.join(DATA_DIR, "joblib"), verbose=0)
+
+LAGS = (1, 5)
+VOL_WINDOW = 5
+
+SEARCH_SPACE = {
+    "tree": {"max_depth": [2, 3, 4, 5], "min_samples_leaf": [1, 5, 20]},
+    "forest": {"n_estimators": [100], "max_depth": [3, 5, None], "min_samples_leaf": [1, 5]},
+}
+
+_ESTIMATORS = {
+    "tree": DecisionTreeClassifier,
+    "forest": RandomForestClassifier,
+}
+
+
+def _engineer(X: pd.DataFrame) -> pd.DataFrame:
+    """Return raw indicators plus changes and rolling volatility (disk-cached)."""
+    parts = [X]
+    for lag in LAGS:
+        parts.append(X.diff(lag).add_suffix(f"__chg{lag}"))
+    parts.append(X.diff().rolling(VOL_WINDOW, min_periods=2).std().add_suffix(f"__vol{VOL_WINDOW}"))
+    return pd.concat(parts, axis=1).fillna(0.0)
+
+
+engineer_features = MEMORY.cache(_engineer)
+
+
+def base_feature(name: str) -> str:
+    """Return the indicator an engineered feature was derived from."""
+    return name.split("__", 1)[0]
+
+
+def _candidates(models: Sequence[str]) -> List[tuple]:
+    out = []
+    for model in models:
+        grid = SEARCH_SPACE[model]
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            out.append((model, dict(zip(keys, values))))
+    return out
+
+
+def _fit_score(model: str, params: Dict, X: np.ndarray, y: np.ndarray, train, test, seed: int) -> float:
+    est = _ESTIMATORS[model](random_state=seed, **params)
+    est.fit(X[train], y[train])
+    return balanced_accuracy_score(y[test], est.predict(X[test]))
+
+
+def train_pipeline(X: pd.DataFrame, y: Sequence[int], models: Sequence[str] = ("tree", "forest"),
+                   folds: int = 5, n_jobs: int = -1, seed: int = 42, impact: float = 0.05,
+                   min_confidence: float = 0.6) -> Dict:
+    """Search tree/forest configurations and return rules, importances and weights.
+
+    ``X`` holds indicator columns in time order and ``y`` the 0/1 risk labels.
+    Folds are time-ordered so later rows never train earlier predictions.
+    ``rules`` come from a tree refitted on the raw indicators only, so they
+    can be loaded with ``politika_scenarios.ENGINE.load``; ``weights`` sum to
+    one and fit ``doom_watch.set_risk_weights``.
+    """
+    y_arr = np.asarray(y)
+    if X.empty or len(np.unique(y_arr)) < 2:
+        raise ValueError("need a non-empty frame and both label classes")
+    features = engineer_features(X)
+    matrix = features.to_numpy(dtype=float)
+    splits = list(TimeSeriesSplit(n_splits=folds).split(matrix))
+    candidates = _candidates(models)
+
+    jobs = [(c, s) for c in range(len(candidates)) for s in range(len(splits))]
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_score)(candidates[c][0], candidates[c][1], matrix, y_arr, *splits[s], seed)
+        for c, s in jobs
+    )
+    cv = np.array(scores, dtype=float).reshape(len(candidates), len(splits))
+    mean_scores = np.nanmean(cv, axis=1)
+    best = int(np.nanargmax(mean_scores))
+    best_model, best_params = candidates[best]
+    logging.info("best %s %s balanced accuracy %.3f", best_model, best_params, mean_scores[best])
+
+    model = _ESTIMATORS[best_model](random_state=seed, **best_params)
+    if best_model == "forest":
+        model.set_params(n_jobs=n_jobs)
+    model.fit(matrix, y_arr)
+    importances = dict(zip(features.columns, model.feature_importances_))
+
+    by_indicator: Dict[str, float] = {}
+    for name, value in importances.items():
+        by_indicator[base_feature(name)] = by_indicator.get(base_feature(name), 0.0) + float(value)
+    total = sum(by_indicator.values())
+    weights = {k: v / total for k, v in by_indicator.items()} if total else {}
+
+    depth = best_params.get("max_depth") or 3
+    rule_tree = DecisionTreeClassifier(max_depth=min(depth, 4), min_samples_leaf=best_params.get("min_samples_leaf", 1),
+                                       random_state=seed)
+    rule_tree.fit(X.to_numpy(dtype=float), y_arr)
+    rules = extract_rules(rule_tree, list(X.columns), impact=impact, min_confidence=min_confidence)
+
+    return {
+        "model": model,
+        "model_type": best_model,
+        "params": best_params,
+        "cv_scores": {f"{m}:{p}": float(s) for (m, p), s in zip(candidates, mean_scores)},
+        "best_score": float(mean_scores[best]),
+        "importances": importances,
+        "weights": weights,
+        "rules": rules,
+    }
+
+
+def apply_training(result: Dict, apply_rules: bool = True, apply_weights: bool = True) -> None:
+    """Load learned rules next to the hand-written scenarios and set the weights.
+
+    Previously learned rules are replaced, so applying a new result is
+    idempotent. Weights are restricted to the scored indicators and rescaled
+    to sum to one.
+    """
+    import doom_watch as dw
+    from politika_scenarios import ENGINE, SCENARIOS
+
+    if apply_rules:
+        ENGINE.load(SCENARIOS + result["rules"], replace=True)
+    weights = {k: v for k, v in result["weights"].items() if k in dw.INDICATORS}
+    total = sum(weights.values())
+    if apply_weights and total:
+        dw.set_risk_weights({k: v / total for k, v in weights.items()})
+
+
+def clear_cache() -> None:
+    """Drop memoised feature matrices."""
+    MEMORY.clear(warn=False)
@@ -0,0 +1,227 @@
+"""Append-only columnar time-series store for indicator snapshots and scores.
+
+Each column is a flat float64 file read back through ``np.memmap``, so range
+reads touch only the rows and columns asked for. Rows are appended in time
+order; ``ts`` holds Unix timestamps. Appends take a file lock, so the
+service and the dashboard can write to the same store.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import contextlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+from config import DATA_DIR
+
+SCORE_COLUMN = "score"
+SCENARIO_PREFIX = "scenario:"
+_ITEM = np.dtype("<f8").itemsize
+
+
+class TimeSeriesStore:
+    """Columnar store with one float64 file per column plus a timestamp file."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._meta_path = os.path.join(root, "meta.json")
+        self._lock_path = os.path.join(root, "write.lock")
+        self._files: Dict[str, str] = {}
+        self._meta_mtime = 0
+        self._ts_path = os.path.join(root, "ts.f8")
+        with self._write_lock():
+            self._load_meta(force=True)
+            self._repair()
+
+    @contextlib.contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """Serialise writers across threads and, where fcntl exists, processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, "a") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _load_meta(self, force: bool = False) -> None:
+        # Another process may have added columns since we last looked
+        try:
+            mtime = os.stat(self._meta_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if force or mtime != self._meta_mtime:
+            with open(self._meta_path, encoding="utf-8") as fh:
+                self._files = json.load(fh)["columns"]
+            self._meta_mtime = mtime
+
+    @property
+    def columns(self) -> List[str]:
+        self._load_meta()
+        return list(self._files)
+
+    def __len__(self) -> int:
+        return os.path.getsize(self._ts_path) // _ITEM if os.path.exists(self._ts_path) else 0
+
+    def _path(self, column: str) -> str:
+        return os.path.join(self.root, self._files[column])
+
+    def _save_meta(self) -> None:
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"columns": self._files}, fh)
+        os.replace(tmp, self._meta_path)
+        self._meta_mtime = os.stat(self._meta_path).st_mtime_ns
+
+    def _resize(self, path: str, rows: int) -> None:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size > rows * _ITEM:
+            with open(path, "r+b") as fh:
+                fh.truncate(rows * _ITEM)
+        elif size < rows * _ITEM:
+            with open(path, "ab") as fh:
+                fh.write(np.full(rows - size // _ITEM, np.nan).astype("<f8").tobytes())
+
+    def _repair(self) -> None:
+        # A crash between column writes leaves columns longer than ``ts``
+        n = len(self)
+        for column in self._files:
+            self._resize(self._path(column), n)
+
+    def _add_column(self, column: str) -> None:
+        self._files[column] = f"c{len(self._files)}.f8"
+        self._resize(self._path(column), len(self))
+        self._save_meta()
+
+    def append_many(self, ts: Sequence[float], values: Mapping[str, Sequence[float]]) -> None:
+        """Append rows; columns missing from ``values`` are filled with NaN.
+
+        Holds an exclusive file lock, so several processes can append to one
+        store without interleaving their column writes.
+        """
+        with self._write_lock():
+            self._append(np.asarray(ts, dtype="<f8"), values)
+
+    def append(self, values: Mapping[str, float], ts: Optional[float] = None) -> None:
+        """Append one row at ``ts`` (default: now, taken under the write lock)."""
+        with self._write_lock():
+            self._append(np.array([time.time() if ts is None else ts], dtype="<f8"),
+                         {k: [v] for k, v in values.items()})
+
+    def _append(self, ts: np.ndarray, values: Mapping[str, Sequence[float]]) -> None:
+        self._load_meta(force=True)
+        self._repair()
+        last = self.last_timestamp()
+        if len(ts) and (np.any(np.diff(ts) < 0) or (last is not None and ts[0] < last)):
+            raise ValueError("timestamps must be appended in increasing order")
+        for column in values:
+            if column not in self._files:
+                self._add_column(column)
+        for column in self._files:
+            col = np.asarray(values.get(column, np.full(len(ts), np.nan)), dtype="<f8")
+            if col.shape != ts.shape:
+                raise ValueError(f"column {column!r} has {len(col)} rows, expected {len(ts)}")
+            with open(self._path(column), "ab") as fh:
+                fh.write(col.tobytes())
+        # Timestamps last: a row exists only once its ts is written
+        with open(self._ts_path, "ab") as fh:
+            fh.write(ts.tobytes())
+
+    def _map(self, path: str, n: int) -> np.ndarray:
+        if n == 0:
+            return np.empty(0)
+        return np.memmap(path, dtype="<f8", mode="r", shape=(n,))
+
+    def last_timestamp(self) -> Optional[float]:
+        n = len(self)
+        return float(self._map(self._ts_path, n)[-1]) if n else None
+
+    def _slice(self, lo: int, hi: int, columns: Optional[Iterable[str]]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        n = len(self)
+        self._load_meta()
+        cols = self.columns if columns is None else list(columns)
+        out = {}
+        for column in cols:
+            out[column] = self._map(self._path(column), n)[lo:hi] if column in self._files else np.full(hi - lo, np.nan)
+        return self._map(self._ts_path, n)[lo:hi], out
+
+    def read(self, start: Optional[float] = None, end: Optional[float] = None,
+             columns: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Return ``(ts, {column: values})`` for rows with ``start <= ts <= end``.
+
+        Arrays are read-only views onto the column files.
+        """
+        ts = self._map(self._ts_path, len(self))
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side="right"))
+        return self._slice(lo, hi, columns)
+
+    def tail(self, rows: int, columns: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Return the last ``rows`` rows."""
+        n = len(self)
+        return self._slice(max(n - max(rows, 0), 0), n, columns)
+
+    def records(self, rows: int, columns: Optional[Iterable[str]] = None) -> List[Dict[str, float]]:
+        """Return the last ``rows`` rows as a list of dicts, oldest first."""
+        _, out = self.tail(rows, columns)
+        names = list(out)
+        matrix = np.column_stack([out[c] for c in names]) if names else np.empty((0, 0))
+        return [dict(zip(names, row)) for row in matrix.tolist()]
+
+    def downsample(self, interval: float, start: Optional[float] = None, end: Optional[float] = None,
+                   columns: Optional[Iterable[str]] = None, how: str = "mean") -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Aggregate rows into ``interval``-second buckets with ``mean`` or ``last``.
+
+        Returned timestamps are the bucket starts; NaNs are ignored by ``mean``.
+        """
+        ts, out = self.read(start, end, columns)
+        if not len(ts):
+            return ts, {c: np.asarray(v) for c, v in out.items()}
+        buckets = np.floor(ts / interval)
+        starts = np.r_[0, np.flatnonzero(np.diff(buckets)) + 1]
+        ends = np.r_[starts[1:], len(ts)]
+        result = {}
+        for column, values in out.items():
+            values = np.asarray(values)
+            if how == "last":
+                result[column] = values[ends - 1]
+            elif how == "mean":
+                valid = ~np.isnan(values)
+                sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+                counts = np.add.reduceat(valid.astype(int), starts)
+                result[column] = np.divide(sums, counts, out=np.full(len(starts), np.nan), where=counts > 0)
+            else:
+                raise ValueError(f"unknown aggregation {how!r}")
+        return buckets[starts] * interval, result
+
+
+def indicator_columns(store: TimeSeriesStore) -> List[str]:
+    """Return the stored indicator columns (everything but scores and scenario flags)."""
+    return [c for c in store.columns if c != SCORE_COLUMN and not c.startswith(SCENARIO_PREFIX)]
+
+
+_STORE: Optional[TimeSeriesStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> TimeSeriesStore:
+    """Return the process-wide snapshot store under ``DATA_DIR``."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = TimeSeriesStore(os.path.join(DATA_DIR, "history"))
+    return _STORE